@@ -4,6 +4,7 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
 
 from models.base import PaginateQueryParams
+from models.films import FilmResponseModel
 from models.genres import (GenreDetailResponseModel, GenreResponseModel,
                            GenreSort)
 from services.genres import GenreService, get_genre_service
@@ -15,6 +16,28 @@ router = APIRouter()
 PaginateQuery = Annotated[PaginateQueryParams, Depends(PaginateQueryParams)]
 
 
+@router.get(
+    '/search',
+    response_model=list[FilmResponseModel],
+    description="Метод, возвращающий фильмы найденного по названию жанра",
+)
+async def genre_films_search(
+        query: str,
+        pagination: PaginateQuery,
+        process_id: str = None,
+        genre_service: GenreService = Depends(get_genre_service)
+) -> list[FilmResponseModel]:
+
+    films = await genre_service.search_genre_films(
+        query=query,
+        page_size=pagination.page_size,
+        page_number=pagination.page_number,
+        process_id=process_id
+    )
+
+    return films
+
+
 @router.get(
     "/{genre_id}",
     response_model=GenreDetailResponseModel,
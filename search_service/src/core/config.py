@@ -15,6 +15,24 @@ class Settings(BaseSettings):
     ELASTIC_HOST: str = Field(..., env='ELASTIC_HOST')
     ELASTIC_PORT: int = Field(..., env='ELASTIC_PORT')
 
+    RABBIT_HOST: str = Field(..., env='RABBIT_HOST')
+    RABBIT_PORT: str = Field(..., env='RABBIT_PORT')
+    RABBIT_USER: str = Field(..., env='RABBIT_USER')
+    RABBIT_PASS: str = Field(..., env='RABBIT_PASS')
+
+    QUERY_BATCH_SIZE: int = Field(50, env='QUERY_BATCH_SIZE')
+    QUERY_BATCH_TIMEOUT: float = Field(0.05, env='QUERY_BATCH_TIMEOUT')
+    QUERY_CONCURRENCY: int = Field(10, env='QUERY_CONCURRENCY')
+    RESULTS_CHANNEL: str = Field('search.results', env='RESULTS_CHANNEL')
+
+    def get_amqp_uri(self):
+        return 'amqp://{user}:{password}@{host}:{port}/'.format(
+            user=self.RABBIT_USER,
+            password=self.RABBIT_PASS,
+            host=self.RABBIT_HOST,
+            port=self.RABBIT_PORT
+        )
+
     class Config:
         env_file = '.env'
 
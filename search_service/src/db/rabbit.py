@@ -0,0 +1,59 @@
+import asyncio
+
+from aio_pika import ExchangeType, connect_robust
+from aio_pika.abc import (AbstractChannel, AbstractExchange, AbstractQueue,
+                          AbstractRobustConnection)
+
+
+class RMQ:
+    def __init__(self) -> None:
+        self.connection: AbstractRobustConnection | None = None
+        self.channel: AbstractChannel | None = None
+        self.exchange: AbstractExchange | None = None
+
+    async def connect(
+            self,
+            url: str,
+            topic_name: str = 'topic_v1',
+            prefetch_count: int | None = None,
+    ):
+        self.connection = await connect_robust(
+            url=url,
+            loop=asyncio.get_running_loop()
+        )
+
+        self.channel = await self.connection.channel()
+        if prefetch_count:
+            await self.channel.set_qos(prefetch_count=prefetch_count)
+
+        self.exchange = await self.channel.declare_exchange(
+            topic_name,
+            ExchangeType.TOPIC
+        )
+
+    async def declare_queue(
+            self,
+            queue_name: str,
+            binding_keys: str | list[str],
+    ) -> AbstractQueue:
+        queue = await self.channel.declare_queue(queue_name, durable=True)
+
+        if isinstance(binding_keys, str):
+            binding_keys = [binding_keys]
+        for binding_key in binding_keys:
+            await queue.bind(self.exchange, routing_key=binding_key)
+
+        return queue
+
+    async def close(self):
+        if self.channel:
+            await self.channel.close()
+        if self.connection:
+            await self.connection.close()
+
+
+rabbit: RMQ | None = None
+
+
+async def get_rabbit() -> RMQ:
+    return rabbit
@@ -7,13 +7,6 @@ from api.v1 import films, genres, persons
 from core.config import settings
 from services.utils.preview import startup, shutdown
 
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    docs_url='/api/openapi',
-    openapi_url='/api/openapi.json',
-    default_response_class=ORJSONResponse,
-)
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -22,6 +15,15 @@ async def lifespan(app: FastAPI):
     await shutdown()
 
 
+app = FastAPI(
+    lifespan=lifespan,
+    title=settings.PROJECT_NAME,
+    docs_url='/api/openapi',
+    openapi_url='/api/openapi.json',
+    default_response_class=ORJSONResponse,
+)
+
+
 app.include_router(films.router, prefix='/api/v1/films', tags=['films'])
 app.include_router(genres.router, prefix='/api/v1/genres', tags=['genres'])
 app.include_router(persons.router, prefix='/api/v1/persons', tags=['persons'])
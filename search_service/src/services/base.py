@@ -3,6 +3,8 @@ from redis.asyncio import Redis
 import json
 import abc
 
+from core.config import settings
+
 
 class AbstractStorage(abc.ABC):
     @abc.abstractmethod
@@ -61,6 +63,24 @@ class ElasticStorage(AbstractStorage):
 
         return [item['_source'] for item in data['hits']['hits']]
 
+    async def multi_search(
+            self,
+            searches: list[tuple[str, dict]],
+    ) -> list[list[dict]]:
+        """Метод выполняет несколько поисков одним запросом msearch
+        и возвращает найденные документы вместе с _score."""
+
+        body = []
+        for index, query in searches:
+            body.extend(({'index': index}, query))
+
+        data = await self.elastic.msearch(body=body)
+
+        return [
+            response.get('hits', {}).get('hits', [])
+            for response in data['responses']
+        ]
+
 
 class RedisCache(AbstractCache):
     def __init__(
@@ -77,11 +97,19 @@ class RedisCache(AbstractCache):
         return json.loads(data)
 
     async def set_by_id(self, *args, **kwargs):
-        await self.redis.set(
+        """Метод записывает значение по ключу. Для результата поиска
+        (notify=True) ключ публикуется в канал RESULTS_CHANNEL, чтобы
+        web_api сразу ответил ожидающим клиентам."""
+
+        pipeline = self.redis.pipeline()
+        pipeline.set(
             kwargs.get('key'),
             kwargs.get('value'),
             kwargs.get('ttl'),
         )
+        if kwargs.get('notify'):
+            pipeline.publish(settings.RESULTS_CHANNEL, kwargs.get('key'))
+        await pipeline.execute()
 
 
 class BaseService:
@@ -120,7 +148,7 @@ class BaseService:
                 return None
 
             await self.cache_handler.set_by_id(
-                key=process_id,
+                key=cache_key,
                 value=json.dumps(data),
                 ttl=ttl,
             )
@@ -198,6 +226,7 @@ class BaseService:
                         key=process_id,
                         value=json.dumps([]),
                         ttl=ttl,
+                        notify=True,
                     )
                 return []
 
@@ -212,6 +241,7 @@ class BaseService:
                 key=process_id,
                 value=json.dumps(data),
                 ttl=ttl,
+                notify=True,
             )
 
         return data
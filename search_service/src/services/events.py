@@ -0,0 +1,216 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+import orjson
+from aio_pika.abc import AbstractIncomingMessage, AbstractQueue
+
+from services.films import FilmService
+from services.genres import GenreService
+from services.persons import PersonService
+from services.utils.body_elastic import get_body_query
+
+logger = logging.getLogger(__name__)
+
+SPECULATIVE_PREFIX = 'speculative:'
+# Индекс и поле, по которым проверяется гипотеза каждого типа запроса
+QUERY_TARGETS = {
+    'movie': ('movies', 'title'),
+    'person': ('persons', 'full_name'),
+    'genre': ('genres', 'name'),
+}
+
+
+class QueryEventConsumer:
+    """Класс обрабатывает события events.query от voice_service.
+
+    Сообщения читаются пачками, одинаковые запросы внутри пачки
+    выполняются в Elasticsearch один раз, число одновременных
+    поисков ограничено семафором. Результат записывается в Redis
+    по process_id так же, как при поиске через API.
+
+    Упреждающие события (speculative) пишут результат под отдельным
+    ключом; если итоговое событие подтверждает гипотезу, этот
+    результат копируется под process_id без повторного поиска.
+
+    Если в событии есть альтернативные гипотезы распознавания, все
+    они проверяются одним msearch и для поиска берётся гипотеза
+    с лучшим совпадением.
+    """
+
+    def __init__(
+            self,
+            queue: AbstractQueue,
+            film_service: FilmService,
+            person_service: PersonService,
+            genre_service: GenreService,
+            batch_size: int = 50,
+            batch_timeout: float = 0.05,
+            concurrency: int = 10,
+            ttl: int = 300,
+    ):
+        self.queue = queue
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.ttl = ttl
+        self.film_service = film_service
+        self.person_service = person_service
+        self.genre_service = genre_service
+        self.cache_handler = film_service.cache_handler
+        # Ожидание следующего сообщения, переживающее таймаут пачки
+        self._pending: asyncio.Task | None = None
+        self.handlers = {
+            'movie': self.film_service.search_film_by_query,
+            'person': self.person_service.search_person_with_films,
+            'genre': self.genre_service.search_genre_films,
+        }
+
+    async def run(self):
+        async with self.queue.iterator() as iterator:
+            try:
+                await self._consume(iterator)
+            finally:
+                if self._pending:
+                    self._pending.cancel()
+
+    async def _consume(self, iterator):
+        while True:
+            batch = await self._next_batch(iterator)
+            groups = defaultdict(list)
+            for message in batch:
+                try:
+                    event = orjson.loads(message.body)
+                    if not isinstance(event, dict):
+                        raise ValueError('событие не является объектом')
+                except ValueError as error:
+                    logger.error(f'Некорректное событие - {error}')
+                    await message.reject()
+                    continue
+                groups[(event.get('intent'), event.get('query'))].append(
+                    (message, event)
+                )
+
+            await asyncio.gather(*(
+                self._handle_group(intent, query, items)
+                for (intent, query), items in groups.items()
+            ))
+
+    async def _next_batch(self, iterator) -> list[AbstractIncomingMessage]:
+        """Метод собирает пачку сообщений.
+
+        Ожидание следующего сообщения не отменяется по таймауту:
+        отмена __anext__ закрывает итератор aio-pika и возвращает
+        в очередь ещё не подтверждённые сообщения. Незавершённое
+        ожидание переходит в следующую пачку.
+        """
+
+        batch = []
+        while len(batch) < self.batch_size:
+            if self._pending is None:
+                self._pending = asyncio.ensure_future(iterator.__anext__())
+            done, _ = await asyncio.wait(
+                {self._pending},
+                timeout=self.batch_timeout if batch else None,
+            )
+            if not done:
+                break
+            batch.append(self._pending.result())
+            self._pending = None
+        return batch
+
+    async def _handle_group(
+            self,
+            intent: str | None,
+            query: str | None,
+            items: list[tuple[AbstractIncomingMessage, dict]],
+    ):
+        async with self.semaphore:
+            for message, event in items:
+                try:
+                    await self._handle_event(intent, query, event)
+                except Exception as error:
+                    logger.error(f'Ошибка обработки события - {error}')
+                    await message.reject()
+                else:
+                    await message.ack()
+
+    async def _handle_event(self, intent: str | None, query: str | None, event: dict):
+        process_id = event['process_id']
+        if event.get('speculative'):
+            await self._search(intent, query, SPECULATIVE_PREFIX + process_id)
+            return
+
+        if event.get('speculation_confirmed') and await self._commit_speculation(process_id):
+            return
+
+        if event.get('alternatives'):
+            intent, query = await self._pick_query(intent, query, event['alternatives'])
+
+        await self._search(intent, query, process_id)
+
+    async def _pick_query(
+            self,
+            intent: str | None,
+            query: str | None,
+            alternatives: list[dict],
+    ) -> tuple[str | None, str | None]:
+        candidates = []
+        for candidate in [(intent, query)] + [
+            (alternative.get('intent'), alternative.get('query'))
+            for alternative in alternatives
+        ]:
+            if candidate[0] in QUERY_TARGETS and candidate[1] and candidate not in candidates:
+                candidates.append(candidate)
+
+        if len(candidates) < 2:
+            return candidates[0] if candidates else (intent, query)
+
+        searches = []
+        for candidate_intent, candidate_query in candidates:
+            index, field = QUERY_TARGETS[candidate_intent]
+            searches.append((
+                index,
+                get_body_query(field=field, value=candidate_query, offset=0, size=1),
+            ))
+        results = await self.film_service.storage_handler.multi_search(searches)
+
+        # При равных оценках остаётся гипотеза с большей уверенностью
+        scores = [hits[0]['_score'] if hits else 0 for hits in results]
+        best = scores.index(max(scores))
+        if best:
+            logger.info(
+                f'Выбрана альтернативная гипотеза {candidates[best]} '
+                f'вместо {(intent, query)}'
+            )
+        return candidates[best]
+
+    async def _commit_speculation(self, process_id: str) -> bool:
+        data = await self.cache_handler.get_by_id(
+            key=SPECULATIVE_PREFIX + process_id,
+        )
+        if data is None:
+            return False
+
+        await self.cache_handler.set_by_id(
+            key=process_id,
+            value=json.dumps(data),
+            ttl=self.ttl,
+            notify=True,
+        )
+        return True
+
+    async def _search(self, intent: str | None, query: str | None, process_id: str):
+        handler = self.handlers.get(intent)
+        if handler is None or not query:
+            await self.cache_handler.set_by_id(
+                key=process_id,
+                value=json.dumps([]),
+                ttl=self.ttl,
+                notify=True,
+            )
+            return
+
+        # Повторные запросы в группе попадают в кэш по query
+        await handler(query=query, process_id=process_id)
@@ -91,9 +91,10 @@ class FilmService(BaseService):
             ttl=self.FILM_CACHE_EXPIRE_IN_SECONDS,
             page_size=page_size,
             page_number=page_number,
-            process_id=process_id
         )
 
+        # Результат по process_id пишется один раз, уже в виде
+        # FilmResponseModel: ожидающий клиент просыпается на первой записи
         if process_id:
             await self.cache_handler.set_by_id(
                 key=process_id,
@@ -103,6 +104,7 @@ class FilmService(BaseService):
                     else json.dumps([])
                 ),
                 ttl=300,
+                notify=True,
             )
 
         return data_list
@@ -1,3 +1,4 @@
+import json
 from functools import lru_cache
 
 from elasticsearch import AsyncElasticsearch
@@ -6,9 +7,10 @@ from redis.asyncio import Redis
 
 from db.elastic import get_elastic
 from db.redis import get_redis
+from models.films import FilmResponseModel
 from models.genres import (GenreDetailResponseModel, GenreResponseModel,
                            GenreSort)
-from services.utils.body_elastic import get_body_search
+from services.utils.body_elastic import get_body_query, get_body_search
 
 from .base import BaseService, ElasticStorage, RedisCache
 
@@ -58,6 +60,60 @@ class GenreService(BaseService):
 
         return data_list
 
+    async def search_genre_films(
+            self,
+            query: str,
+            page_size: int = 50,
+            page_number: int = 1,
+            process_id: str = None
+    ) -> list[FilmResponseModel]:
+        """Метод находит жанр по названию и возвращает его фильмы."""
+
+        body_genre = get_body_query(
+            field='name',
+            value=query,
+            size=1,
+            offset=0,
+        )
+        genres = await self.get_list(
+            index='genres',
+            body=body_genre,
+            ttl=self.FILM_CACHE_EXPIRE_IN_SECONDS,
+            unique_key=f'search-{query}',
+        )
+
+        data_list = []
+        if genres:
+            genre_id = genres[0].get('id')
+            body = get_body_search(
+                size=page_size,
+                sort_by='imdb_rating',
+                offset=(page_size * page_number) - page_size,
+                sort_order='desc',
+                genre=genre_id,
+            )
+            data_list = await self.get_list(
+                index='movies',
+                sort_by='imdb_rating',
+                body=body,
+                ttl=self.FILM_CACHE_EXPIRE_IN_SECONDS,
+                page_size=page_size,
+                page_number=page_number,
+                genre=genre_id,
+            )
+
+        if process_id:
+            await self.cache_handler.set_by_id(
+                key=process_id,
+                value=json.dumps(
+                    [FilmResponseModel(**i).dict() for i in data_list]
+                ),
+                ttl=300,
+                notify=True,
+            )
+
+        return data_list
+
 
 @lru_cache()
 def get_genre_service(
@@ -187,6 +187,7 @@ class PersonService(BaseService):
                 key=process_id,
                 value=json.dumps(persons_list),
                 ttl=300,
+                notify=True,
             )
         return persons_list
 
@@ -1,7 +1,40 @@
-from db import redis, elastic
+import asyncio
+import logging
+from functools import partial
+
+from db import redis, elastic, rabbit
 from redis.asyncio import Redis
 from elasticsearch import AsyncElasticsearch
 from core.config import settings
+from services.events import QueryEventConsumer
+from services.films import get_film_service
+from services.genres import get_genre_service
+from services.persons import get_person_service
+
+logger = logging.getLogger(__name__)
+
+CONSUMER_RESTART_DELAY = 5
+
+consumer_task: asyncio.Task | None = None
+
+
+def start_consumer(consumer: QueryEventConsumer) -> None:
+    global consumer_task
+
+    consumer_task = asyncio.create_task(consumer.run())
+    consumer_task.add_done_callback(partial(restart_consumer, consumer))
+
+
+def restart_consumer(consumer: QueryEventConsumer, task: asyncio.Task) -> None:
+    """Обработчик events.query перезапускается, если упал,
+    иначе события перестают обрабатываться до перезапуска сервиса."""
+
+    if task.cancelled():
+        return
+    logger.error(f'Обработчик событий остановился - {task.exception()!r}')
+    asyncio.get_running_loop().call_later(
+        CONSUMER_RESTART_DELAY, start_consumer, consumer,
+    )
 
 
 async def startup() -> None:
@@ -9,8 +42,31 @@ async def startup() -> None:
     elastic.es = AsyncElasticsearch(
         hosts=[f'{settings.ELASTIC_HOST}:{settings.ELASTIC_PORT}'])
 
+    rabbit.rabbit = rabbit.RMQ()
+    await rabbit.rabbit.connect(
+        url=settings.get_amqp_uri(),
+        prefetch_count=settings.QUERY_BATCH_SIZE,
+    )
+    queue = await rabbit.rabbit.declare_queue('search_service', 'events.query')
+    consumer = QueryEventConsumer(
+        queue=queue,
+        film_service=get_film_service(redis.redis, elastic.es),
+        person_service=get_person_service(redis.redis, elastic.es),
+        genre_service=get_genre_service(redis.redis, elastic.es),
+        batch_size=settings.QUERY_BATCH_SIZE,
+        batch_timeout=settings.QUERY_BATCH_TIMEOUT,
+        concurrency=settings.QUERY_CONCURRENCY,
+    )
+    start_consumer(consumer)
+
 
 async def shutdown() -> None:
+    if consumer_task:
+        consumer_task.cancel()
+
+    if rabbit.rabbit:
+        await rabbit.rabbit.close()
+
     if redis.redis:
         await redis.redis.close()
 
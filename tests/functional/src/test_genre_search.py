@@ -0,0 +1,26 @@
+from http import HTTPStatus
+
+import pytest
+from functional.settings import test_settings
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_genre_films_search(es_write_data, client_session):
+    url = test_settings.service_url + '/api/v1/genres/search'
+
+    async with client_session.get(url, params=dict(query='Action')) as response:
+        body = await response.json()
+
+        assert response.status == HTTPStatus.OK
+        assert len(body) == 50
+
+
+async def test_genre_films_search_not_found(es_write_data, client_session):
+    url = test_settings.service_url + '/api/v1/genres/search'
+
+    async with client_session.get(url, params=dict(query='Mashed potato')) as response:
+        body = await response.json()
+
+        assert response.status == HTTPStatus.OK
+        assert len(body) == 0
@@ -7,8 +7,8 @@ def get_es_data():
         'id': str(uuid.uuid4()) if i != 0 else "1f90980e-e7c9-4fac-a1e4-f34409daeff2",
         'imdb_rating': 8.5,
         'genres': [
-            {'id': '565', 'name': 'Sci-Fi'},
-            {'id': '678', 'name': 'Action'}
+            {'id': '566', 'name': 'Sci-Fi'},
+            {'id': '679', 'name': 'Action'}
         ],
         'title': 'The Star',
         'description': 'New World',
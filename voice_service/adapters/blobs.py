@@ -0,0 +1,92 @@
+import abc
+import hashlib
+import mmap
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator
+
+from redis import Redis
+
+from core.config import settings
+
+
+class BlobIntegrityError(Exception):
+    """Содержимое хранилища не совпадает с метаданными сообщения."""
+
+
+class AbstractBlobStorage(abc.ABC):
+    @abc.abstractmethod
+    def open(self, key: str) -> Iterator[bytes | mmap.mmap]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def sweep(self, ttl: int) -> int:
+        return 0
+
+
+class FileBlobStorage(AbstractBlobStorage):
+    """Хранилище аудио в общем каталоге, файлы читаются через mmap."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / Path(key).name
+
+    @contextmanager
+    def open(self, key: str) -> Iterator[mmap.mmap]:
+        with open(self._path(key), "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as blob:
+                yield blob
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def sweep(self, ttl: int) -> int:
+        """Метод удаляет файлы, которые пережили ttl
+        (например, если воркер упал до завершения задачи)."""
+
+        deadline = time.time() - ttl
+        removed = 0
+        for path in self.directory.iterdir():
+            if path.is_file() and path.stat().st_mtime < deadline:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+class RedisBlobStorage(AbstractBlobStorage):
+    """Хранилище аудио в Redis, устаревание обеспечивает TTL ключа."""
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+
+    @contextmanager
+    def open(self, key: str) -> Iterator[bytes]:
+        blob = self.redis.get(key)
+        if blob is None:
+            raise FileNotFoundError(key)
+        yield blob
+
+    def delete(self, key: str) -> None:
+        self.redis.delete(key)
+
+
+def check_blob(blob: bytes | mmap.mmap, size: int, digest: str) -> None:
+    if len(blob) != int(size):
+        raise BlobIntegrityError(f"Размер {len(blob)} != {size}")
+    if digest and hashlib.blake2b(blob).hexdigest() != digest:
+        raise BlobIntegrityError("Хэш аудио не совпадает")
+
+
+@lru_cache()
+def get_blob_storage() -> AbstractBlobStorage:
+    if settings.blob_storage == "redis":
+        return RedisBlobStorage(Redis.from_url(settings.blob_redis_url))
+    return FileBlobStorage(settings.blob_dir)
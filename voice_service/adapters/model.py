@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+from vosk import KaldiRecognizer, Model
+
+from core.config import settings
+from core.logger import logger
+
+
+def warm_up(vosk_model: Model) -> None:
+    """Функция прогоняет через модель тишину, чтобы страницы модели
+    оказались в памяти до первой задачи."""
+
+    frames = settings.vosk_sample_rate * settings.vosk_warmup_seconds
+    rec = KaldiRecognizer(vosk_model, settings.vosk_sample_rate)
+    rec.AcceptWaveform(bytes(frames * 2))
+    rec.FinalResult()
+
+
+class ModelRegistry:
+    """Реестр моделей процесса.
+
+    Модели загружаются из каталога models_dir при первом обращении
+    (подкаталог с именем модели). Если суммарный размер загруженных
+    моделей превышает memory_budget_mb, выгружаются давно не
+    использованные. Размер модели оценивается по файлам на диске.
+    """
+
+    def __init__(self, models_dir: str, memory_budget_mb: float) -> None:
+        self.models_dir = Path(models_dir)
+        self.memory_budget_mb = memory_budget_mb
+        self.on_evict: list[Callable[[str], None]] = []
+        self._models: OrderedDict[str, Model] = OrderedDict()
+        self._sizes: dict[str, float] = {}
+        self._load_seconds: dict[str, float] = {}
+        self._lock = threading.RLock()
+
+    def path(self, name: str) -> Path:
+        path = self.models_dir / name
+        # Совместимость с одной моделью в VOSK_MODEL_PATH
+        if name == settings.vosk_default_model and not path.exists():
+            return Path(settings.vosk_model_path)
+        return path
+
+    def get(self, name: str | None = None) -> Model:
+        name = name or settings.vosk_default_model
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                return self._models[name]
+            return self._load(name)
+
+    def _load(self, name: str) -> Model:
+        path = self.path(name)
+        started = time.perf_counter()
+        model = Model(str(path))
+        warm_up(model)
+
+        self._models[name] = model
+        self._sizes[name] = sum(
+            file.stat().st_size for file in path.rglob("*") if file.is_file()
+        ) / 2 ** 20
+        self._load_seconds[name] = time.perf_counter() - started
+        logger.info(
+            "Модель загружена",
+            model=name,
+            path=str(path),
+            seconds=round(self._load_seconds[name], 3),
+            size_mb=round(self._sizes[name], 1),
+        )
+        self._evict(keep=name)
+        return model
+
+    def _evict(self, keep: str) -> None:
+        while self.resident_mb() > self.memory_budget_mb and len(self._models) > 1:
+            name = next(iter(self._models))
+            if name == keep:
+                break
+            del self._models[name]
+            for callback in self.on_evict:
+                callback(name)
+            logger.info(
+                "Модель выгружена",
+                model=name,
+                resident=list(self._models),
+                resident_mb=round(self.resident_mb(), 1),
+            )
+
+    def is_resident(self, name: str) -> bool:
+        return name in self._models
+
+    def resident_mb(self) -> float:
+        return sum(self._sizes[name] for name in self._models)
+
+    def stats(self) -> dict:
+        """Метод возвращает загруженные модели и время их загрузки."""
+
+        with self._lock:
+            return dict(
+                resident=list(self._models),
+                resident_mb=round(self.resident_mb(), 1),
+                memory_budget_mb=self.memory_budget_mb,
+                load_seconds={
+                    name: round(seconds, 3)
+                    for name, seconds in self._load_seconds.items()
+                },
+            )
+
+
+registry = ModelRegistry(
+    models_dir=settings.vosk_models_dir,
+    memory_budget_mb=settings.model_memory_budget_mb,
+)
+
+
+def load_model() -> None:
+    """Функция заранее загружает и прогревает модели воркера
+    (по умолчанию - основную), до форка их страницы разделяются
+    между процессами. Остальные модели загружаются при первой задаче."""
+
+    for name in settings.vosk_preload_models or [settings.vosk_default_model]:
+        registry.get(name)
+
+
+def get_model(name: str | None = None) -> Model:
+    return registry.get(name)
@@ -0,0 +1,46 @@
+import threading
+
+from kombu import Connection, Exchange, Producer
+
+from core.config import settings
+
+QUERY_ROUTING_KEY = "events.query"
+
+exchange = Exchange("topic_v1", type="topic", durable=False)
+
+producer: Producer | None = None
+# Соединение kombu не потокобезопасно, а в режиме threads события
+# публикуют сразу несколько потоков распознавания
+producer_lock = threading.Lock()
+
+
+def get_producer() -> Producer:
+    """Функция создаёт соединение с RabbitMQ один раз на процесс
+    (после форка), чтобы синхронные воркеры могли публиковать события.
+    Вызывается под producer_lock."""
+
+    global producer
+    if producer is None:
+        connection = Connection(settings.get_amqp_uri())
+        producer = Producer(connection, exchange=exchange, serializer="json")
+    return producer
+
+
+def publish_query(event: dict) -> None:
+    with producer_lock:
+        get_producer().publish(
+            event,
+            routing_key=QUERY_ROUTING_KEY,
+            correlation_id=event["process_id"],
+            delivery_mode=2,
+            declare=[exchange],
+            retry=True,
+            # Ограниченные повторы: при недоступном RabbitMQ ошибка
+            # возвращается вызывающему, который повторит задачу позже
+            retry_policy={
+                "max_retries": settings.publish_max_retries,
+                "interval_start": 0,
+                "interval_step": 1,
+                "interval_max": 1,
+            },
+        )
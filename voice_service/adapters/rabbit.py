@@ -15,12 +15,14 @@ class RMQ:
         self.channel: Channel | None = None
         self.exchange: Exchange | None = None
         self.queue: AbstractQueue | None = None
+        self.queues: list[AbstractQueue] = []
 
     async def connect(
         self,
         url: str,
         queue_name: str,
-        topic_name: str = "topic_v1"
+        topic_name: str = "topic_v1",
+        prefetch_count: int | None = None,
     ):
         self.topic_name = topic_name
         self.connection = await connect_robust(
@@ -29,12 +31,47 @@ class RMQ:
         )
 
         self.channel = await self.connection.channel()
+        if prefetch_count:
+            await self.channel.set_qos(prefetch_count=prefetch_count)
 
         self.exchange = await self.channel.declare_exchange(
             self.topic_name,
             ExchangeType.TOPIC
         )
         self.queue = await self.channel.declare_queue(queue_name, durable=True)
+        self.queues = [self.queue]
+
+    async def declare_queue(
+        self,
+        queue_name: str,
+        prefetch_count: int | None = None,
+    ) -> AbstractQueue:
+        """Дополнительная очередь на отдельном канале,
+        чтобы у неё был собственный лимит неподтверждённых сообщений."""
+
+        channel = await self.connection.channel()
+        if prefetch_count:
+            await channel.set_qos(prefetch_count=prefetch_count)
+        queue = await channel.declare_queue(queue_name, durable=True)
+        self.queues.append(queue)
+        return queue
+
+    async def set_prefetch(self, prefetch_count: int) -> None:
+        """Общий для канала лимит неподтверждённых сообщений,
+        его можно менять без пересоздания консьюмера."""
+
+        await self.channel.set_qos(prefetch_count=prefetch_count, global_=True)
+
+    async def queue_depth(self) -> int:
+        depth = 0
+        for queue in self.queues:
+            # robust=False: иначе каждый опрос добавляет очередь в набор,
+            # который канал заново объявляет после переподключения
+            queue = await self.channel.declare_queue(
+                queue.name, passive=True, robust=False,
+            )
+            depth += queue.declaration_result.message_count
+        return depth
 
     async def send(
         self,
@@ -0,0 +1,18 @@
+from redis import Redis
+
+from core.config import settings
+
+redis: Redis | None = None
+
+
+def get_redis() -> Redis:
+    """Функция создаёт клиент Redis один раз на процесс (после форка)."""
+
+    global redis
+    if redis is None:
+        redis = Redis(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            db=settings.redis_db,
+        )
+    return redis
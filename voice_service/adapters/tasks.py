@@ -0,0 +1,70 @@
+from celery import Celery
+from kombu.exceptions import ChannelError
+
+from core.config import settings
+from services.routing import resolve_model_name
+
+RECOGNIZE_TASK = "worker.request_async_api"
+LANE_QUEUES = {"short": "voice.short", "long": "voice.long"}
+
+client = Celery(
+    "voice_client",
+    broker=settings.celery_broker_url,
+    backend=settings.celery_result_backend,
+)
+
+
+def lane_queues(lanes: list[str], models: list[str] | None = None) -> list[str]:
+    """Функция возвращает имена очередей Celery для полос lanes.
+    При MODEL_QUEUES у каждой полосы своя очередь на модель
+    (по умолчанию - на каждую из VOSK_MODELS)."""
+
+    queues = [LANE_QUEUES[lane] for lane in lanes]
+    if not settings.model_queues:
+        return queues
+    return [
+        f"{queue}.{model_name}"
+        for queue in queues
+        for model_name in models or settings.vosk_models
+    ]
+
+
+def queue_depth() -> int:
+    """Функция возвращает число задач, ожидающих в очередях Celery."""
+
+    queues = lane_queues(list(LANE_QUEUES))
+    depth = 0
+    with client.connection_for_read() as connection:
+        channel = connection.default_channel
+        for queue in queues:
+            try:
+                depth += channel.queue_declare(queue=queue, passive=True).message_count
+            except ChannelError:
+                # Очередь ещё не создана воркером
+                continue
+    return depth
+
+
+def send_recognition_task(body: bytes, headers: dict) -> None:
+    """Функция ставит задачу распознавания по имени,
+    не импортируя модуль воркера вместе с vosk и моделью.
+
+    Аудио передаётся как есть, поэтому используется msgpack:
+    json не умеет переносить произвольные байты, а pickle позволил бы
+    любому, кто пишет в брокер, выполнить код на воркере. Короткие и длинные
+    записи попадают в разные очереди Celery, которые обрабатывают
+    разные воркеры. При MODEL_QUEUES очередь выбирается ещё
+    и по модели, чтобы воркер держал в памяти только свои модели.
+    """
+
+    queue = LANE_QUEUES[headers.get("lane", "short")]
+    if settings.model_queues:
+        model_name = resolve_model_name(headers.get("model"), headers.get("language"))
+        queue = f"{queue}.{model_name}"
+
+    client.send_task(
+        RECOGNIZE_TASK,
+        args=(body, headers),
+        serializer="msgpack",
+        queue=queue,
+    )
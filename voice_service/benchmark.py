@@ -0,0 +1,185 @@
+"""Бенчмарк распознавания речи.
+
+Прогоняет каталог WAV-файлов через тот же путь, что и воркер
+(нормализация, VAD, KaldiRecognizer), для каждой комбинации
+параметров и печатает результаты в JSON. Для сравнения prefork-пула
+и пула потоков с одной моделью на процесс выводится пропускная
+способность и пиковый суммарный PSS процесса с потомками.
+
+Пример:
+    python benchmark.py ../tests/functional/testdata \\
+        --chunk-frames 4000 8000 --words on off --processes 1 2 \\
+        --threads 2 --output bench.json
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import resource
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from adapters.model import load_model, registry
+from core.config import settings
+from core.process import max_rss_mb, tree_pss_mb
+from services.audio import parse_wav_header
+from services.recognition import transcribe
+
+fixtures: list[bytes] = []
+
+
+def _run_job(index: int, sample_rate: int, chunk_frames: int, words: bool):
+    started = time.perf_counter()
+    transcribe(
+        fixtures[index],
+        sample_rate=sample_rate,
+        chunk_frames=chunk_frames,
+        words=words,
+    )
+    return time.perf_counter() - started, max_rss_mb()
+
+
+def _create_executor(kind: str, workers: int) -> Executor:
+    if kind == "process":
+        # fork после загрузки модели, как в prefork-пуле Celery
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("fork"),
+        )
+    # Одна модель на процесс, распознаватели на потоках
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def _sample_pss(stop: threading.Event, peak: list[float]) -> None:
+    while not stop.wait(0.2):
+        peak[0] = max(peak[0], tree_pss_mb())
+
+
+def run_config(
+    kind: str,
+    workers: int,
+    sample_rate: int,
+    chunk_frames: int,
+    words: bool,
+    repeat: int,
+    audio_seconds: float,
+) -> dict:
+    jobs = list(range(len(fixtures))) * repeat
+    peak_pss = [tree_pss_mb()]
+    stop = threading.Event()
+    sampler = threading.Thread(target=_sample_pss, args=(stop, peak_pss))
+    sampler.start()
+    try:
+        with _create_executor(kind, workers) as executor:
+            started = time.perf_counter()
+            results = list(executor.map(
+                _run_job,
+                jobs,
+                itertools.repeat(sample_rate),
+                itertools.repeat(chunk_frames),
+                itertools.repeat(words),
+            ))
+            wall_seconds = time.perf_counter() - started
+    finally:
+        stop.set()
+        sampler.join()
+
+    latencies = np.array([latency for latency, _ in results])
+    total_audio = audio_seconds * repeat
+    return dict(
+        executor=kind,
+        workers=workers,
+        sample_rate=sample_rate,
+        chunk_frames=chunk_frames,
+        words=words,
+        jobs=len(jobs),
+        wall_seconds=round(wall_seconds, 3),
+        rtf=round(float(latencies.sum()) / total_audio, 4),
+        throughput_rtf=round(wall_seconds / total_audio, 4),
+        jobs_per_second=round(len(jobs) / wall_seconds, 3),
+        latency_p50=round(float(np.percentile(latencies, 50)), 4),
+        latency_p95=round(float(np.percentile(latencies, 95)), 4),
+        peak_rss_mb=round(max_rss_mb(), 1),
+        worker_peak_rss_mb=round(max(rss for _, rss in results), 1),
+        children_peak_rss_mb=round(
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024, 1
+        ),
+        peak_tree_pss_mb=round(peak_pss[0], 1),
+    )
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("fixtures", type=Path, help="Каталог с WAV-файлами")
+    parser.add_argument(
+        "--sample-rates", type=int, nargs="+",
+        default=[settings.vosk_sample_rate],
+    )
+    parser.add_argument(
+        "--chunk-frames", type=int, nargs="+",
+        default=[settings.recognition_chunk_frames],
+    )
+    parser.add_argument(
+        "--words", choices=["on", "off"], nargs="+",
+        default=["on" if settings.recognition_words else "off"],
+    )
+    parser.add_argument("--processes", type=int, nargs="*", default=[1])
+    parser.add_argument("--threads", type=int, nargs="*", default=[])
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", type=Path)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # Повторные прогоны должны декодироваться, а не читаться из кэша
+    settings.transcript_cache_enabled = False
+
+    paths = sorted(args.fixtures.glob("*.wav"))
+    fixtures.extend(path.read_bytes() for path in paths)
+    audio_seconds = sum(parse_wav_header(data).duration for data in fixtures)
+
+    started = time.perf_counter()
+    load_model()
+    model_load_seconds = time.perf_counter() - started
+
+    executors = [("process", count) for count in args.processes]
+    executors += [("thread", count) for count in args.threads]
+
+    results = [
+        run_config(
+            kind,
+            workers,
+            sample_rate,
+            chunk_frames,
+            words == "on",
+            args.repeat,
+            audio_seconds,
+        )
+        for (kind, workers), sample_rate, chunk_frames, words in itertools.product(
+            executors, args.sample_rates, args.chunk_frames, args.words
+        )
+    ]
+
+    report = dict(
+        model_path=str(registry.path(settings.vosk_default_model)),
+        models=registry.stats(),
+        model_load_seconds=round(model_load_seconds, 3),
+        fixtures=[path.name for path in paths],
+        audio_seconds=round(audio_seconds, 3),
+        vad_enabled=settings.vad_enabled,
+        recognition_grammar=settings.recognition_grammar,
+        results=results,
+    )
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
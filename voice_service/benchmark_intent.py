@@ -0,0 +1,55 @@
+"""Микро-бенчмарк разбора намерений.
+
+Проверяет, что время разбора одного транскрипта не растёт
+с увеличением числа синонимов в автомате.
+
+Пример:
+    python benchmark_intent.py --synonyms 0 1000 10000 100000
+"""
+import argparse
+import json
+import timeit
+
+from services.intent import INTENT_KEYWORDS, IntentMatcher
+
+TRANSCRIPTS = [
+    "help me find movie star wars",
+    "найди фильм звёздные войны с актёром харрисон форд",
+    "покажи кино в жанре комедия",
+    "help me find the person george lucas",
+    "что сегодня посмотреть",
+]
+
+
+def build_keywords(synonyms: int) -> dict[str, list[str]]:
+    keywords = {intent: list(phrases) for intent, phrases in INTENT_KEYWORDS.items()}
+    intents = list(keywords)
+    for index in range(synonyms):
+        keywords[intents[index % len(intents)]].append(f"синоним{index} слово{index}")
+    return keywords
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--synonyms", type=int, nargs="+", default=[0, 1000, 10000])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    results = []
+    for synonyms in args.synonyms:
+        matcher = IntentMatcher(build_keywords(synonyms))
+        seconds = timeit.timeit(
+            lambda: [matcher.parse(text) for text in TRANSCRIPTS],
+            number=args.number,
+        )
+        results.append(dict(
+            synonyms=synonyms,
+            microseconds_per_message=round(
+                seconds / (args.number * len(TRANSCRIPTS)) * 1e6, 3
+            ),
+        ))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
+import os
 from pathlib import Path
 
-from pydantic import BaseSettings, Field
+from pydantic import BaseSettings, Field, validator
 
 BASE_DIR = Path(__file__).parent.parent.parent.absolute()
 
@@ -13,8 +14,6 @@ class Settings(BaseSettings):
     rabbit_user: str = Field(..., env="RABBIT_USER")
     rabbit_pass: str = Field(..., env="RABBIT_PASS")
 
-    search_service_url: str = Field(..., env='SEARCH_SERVICE')
-
     celery_broker_url: str = Field(
         "redis://localhost:6379",
         env="CELERY_BROKER_URL"
@@ -24,6 +23,154 @@ class Settings(BaseSettings):
         env="CELERY_RESULT_BACKEND"
     )
 
+    vosk_model_path: str = Field("./vosk-model", env="VOSK_MODEL_PATH")
+    vosk_models_dir: str = Field("./models", env="VOSK_MODELS_DIR")
+    vosk_models: list[str] = Field(["ru"], env="VOSK_MODELS")
+    vosk_default_model: str = Field("ru", env="VOSK_DEFAULT_MODEL")
+    vosk_preload_models: list[str] = Field([], env="VOSK_PRELOAD_MODELS")
+    model_memory_budget_mb: float = Field(
+        4096.0,
+        env="MODEL_MEMORY_BUDGET_MB"
+    )
+    model_queues: bool = Field(False, env="MODEL_QUEUES")
+    # Полосы и модели (при MODEL_QUEUES), очереди которых читает воркер
+    # Celery; пустой список моделей означает все VOSK_MODELS
+    celery_lanes: list[str] = Field(["short", "long"], env="CELERY_LANES")
+    celery_models: list[str] = Field([], env="CELERY_MODELS")
+
+    fallback_models: dict[str, str] = Field({}, env="FALLBACK_MODELS")
+    fallback_interval: float = Field(5.0, env="FALLBACK_INTERVAL")
+    fallback_depth_high: int = Field(50, env="FALLBACK_DEPTH_HIGH")
+    fallback_depth_low: int = Field(10, env="FALLBACK_DEPTH_LOW")
+    fallback_wait_high: float = Field(10.0, env="FALLBACK_WAIT_HIGH")
+    fallback_wait_low: float = Field(2.0, env="FALLBACK_WAIT_LOW")
+    vosk_sample_rate: int = Field(16000, env="VOSK_SAMPLE_RATE")
+    vosk_warmup_seconds: int = Field(1, env="VOSK_WARMUP_SECONDS")
+    worker_ready_file: str = Field(
+        "/tmp/celery_worker_ready",
+        env="WORKER_READY_FILE"
+    )
+
+    execution_mode: str = Field("celery", env="VOICE_EXECUTION_MODE")
+    recognizer_processes: int = Field(
+        os.cpu_count() or 1,
+        env="RECOGNIZER_PROCESSES"
+    )
+    recognizer_threads: int = Field(
+        os.cpu_count() or 1,
+        env="RECOGNIZER_THREADS"
+    )
+
+    autoscale_enabled: bool = Field(False, env="AUTOSCALE_ENABLED")
+    autoscale_min: int = Field(1, env="AUTOSCALE_MIN")
+    autoscale_max: int = Field(os.cpu_count() or 1, env="AUTOSCALE_MAX")
+    autoscale_interval: float = Field(5.0, env="AUTOSCALE_INTERVAL")
+    autoscale_target_drain_seconds: float = Field(
+        10.0,
+        env="AUTOSCALE_TARGET_DRAIN_SECONDS"
+    )
+    autoscale_up_ticks: int = Field(2, env="AUTOSCALE_UP_TICKS")
+    autoscale_down_ticks: int = Field(6, env="AUTOSCALE_DOWN_TICKS")
+
+    long_lane_slots: int = Field(1, env="LONG_LANE_SLOTS")
+    decode_budget_min: float = Field(5.0, env="DECODE_BUDGET_MIN")
+    decode_budget_rtf: float = Field(0.5, env="DECODE_BUDGET_RTF")
+
+    blob_storage: str = Field("", env="BLOB_STORAGE")
+    blob_dir: str = Field("./temp/audio", env="BLOB_DIR")
+    blob_redis_url: str = Field("redis://localhost:6379/1", env="BLOB_REDIS_URL")
+    blob_ttl: int = Field(3600, env="BLOB_TTL")
+    blob_sweep_interval: int = Field(300, env="BLOB_SWEEP_INTERVAL")
+
+    elastic_host: str = Field("elasticsearch", env="ELASTIC_HOST")
+    elastic_port: int = Field(9200, env="ELASTIC_PORT")
+    elastic_timeout: int = Field(30, env="ELASTIC_TIMEOUT")
+
+    recognition_grammar: bool = Field(False, env="RECOGNITION_GRAMMAR")
+    grammar_cache_path: str = Field(
+        "./temp/cache/grammar.json",
+        env="GRAMMAR_CACHE_PATH"
+    )
+    grammar_refresh_interval: int = Field(
+        600,
+        env="GRAMMAR_REFRESH_INTERVAL"
+    )
+
+    recognition_chunk_frames: int = Field(
+        8000,
+        env="RECOGNITION_CHUNK_FRAMES"
+    )
+    recognition_words: bool = Field(True, env="RECOGNITION_WORDS")
+    recognition_alternatives: int = Field(3, env="RECOGNITION_ALTERNATIVES")
+    parallel_decode: bool = Field(False, env="PARALLEL_DECODE")
+    parallel_decode_threads: int = Field(
+        os.cpu_count() or 1,
+        env="PARALLEL_DECODE_THREADS"
+    )
+    parallel_min_seconds: float = Field(60.0, env="PARALLEL_MIN_SECONDS")
+    parallel_segment_seconds: float = Field(
+        30.0,
+        env="PARALLEL_SEGMENT_SECONDS"
+    )
+    recognizer_pool_size: int = Field(4, env="RECOGNIZER_POOL_SIZE")
+    recognizer_idle_seconds: float = Field(
+        300.0,
+        env="RECOGNIZER_IDLE_SECONDS"
+    )
+
+    redis_host: str = Field("redis", env="REDIS_HOST")
+    redis_port: int = Field(6379, env="REDIS_PORT")
+    redis_db: int = Field(0, env="REDIS_DB")
+
+    transcript_cache_enabled: bool = Field(
+        True,
+        env="TRANSCRIPT_CACHE_ENABLED"
+    )
+    transcript_cache_ttl: int = Field(86400, env="TRANSCRIPT_CACHE_TTL")
+    transcript_cache_lru_size: int = Field(
+        256,
+        env="TRANSCRIPT_CACHE_LRU_SIZE"
+    )
+
+    job_state_enabled: bool = Field(True, env="JOB_STATE_ENABLED")
+    job_state_ttl: int = Field(86400, env="JOB_STATE_TTL")
+    job_claim_ttl: int = Field(120, env="JOB_CLAIM_TTL")
+    job_retry_delay: float = Field(5.0, env="JOB_RETRY_DELAY")
+    cancel_check_interval: float = Field(1.0, env="CANCEL_CHECK_INTERVAL")
+    publish_max_retries: int = Field(3, env="PUBLISH_MAX_RETRIES")
+
+    speculative_search: bool = Field(False, env="SPECULATIVE_SEARCH")
+    speculative_stable_partials: int = Field(
+        2,
+        env="SPECULATIVE_STABLE_PARTIALS"
+    )
+
+    vad_enabled: bool = Field(True, env="VAD_ENABLED")
+    vad_frame_ms: int = Field(30, env="VAD_FRAME_MS")
+    vad_hangover_ms: int = Field(150, env="VAD_HANGOVER_MS")
+    vad_max_pause_ms: int = Field(300, env="VAD_MAX_PAUSE_MS")
+    vad_energy_ratio: float = Field(3.0, env="VAD_ENERGY_RATIO")
+    vad_min_energy: float = Field(200.0, env="VAD_MIN_ENERGY")
+    vad_zcr_threshold: float = Field(0.25, env="VAD_ZCR_THRESHOLD")
+
+    @validator("fallback_models")
+    def check_fallback_models(cls, value, values):
+        # Неизвестное имя модели resolve_model_name заменяет моделью
+        # по умолчанию, и переход на малую модель молча не работал бы
+        models = values.get("vosk_models", [])
+        unknown = sorted(
+            name for pair in value.items() for name in pair
+            if name not in models
+        )
+        if unknown:
+            raise ValueError(
+                f"Модели {unknown} из FALLBACK_MODELS нет в VOSK_MODELS"
+            )
+        return value
+
+    def get_elastic_url(self):
+        return f"http://{self.elastic_host}:{self.elastic_port}"
+
     def get_amqp_uri(self):
         return "amqp://{user}:{password}@{host}:{port}/".format(
             user=self.rabbit_user,
@@ -0,0 +1,59 @@
+import os
+import resource
+
+
+def uptime_seconds() -> float:
+    """Функция возвращает время с момента запуска текущего процесса."""
+
+    with open("/proc/self/stat") as stat:
+        fields = stat.read().rsplit(")", 1)[1].split()
+    with open("/proc/uptime") as uptime:
+        system_uptime = float(uptime.read().split()[0])
+
+    return system_uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+
+
+def max_rss_mb() -> float:
+    """Функция возвращает пиковый RSS процесса в мегабайтах."""
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _children(pid: int) -> list[int]:
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as file:
+            children.extend(int(child) for child in file.read().split())
+    return children
+
+
+def tree_pss_mb(pid: int | None = None) -> float:
+    """Функция возвращает суммарный PSS процесса и всех его потомков.
+
+    В отличие от RSS общие после fork страницы модели учитываются
+    один раз, поэтому память prefork-пула и пула потоков можно
+    сравнивать напрямую.
+    """
+
+    pending = [pid or os.getpid()]
+    total_kb = 0
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/smaps_rollup") as rollup:
+                for line in rollup:
+                    if line.startswith("Pss:"):
+                        total_kb += int(line.split()[1])
+                        break
+            pending.extend(_children(current))
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+    return total_kb / 1024
+
+
+def process_stats() -> dict:
+    return dict(
+        pid=os.getpid(),
+        startup_seconds=round(uptime_seconds(), 3),
+        max_rss_mb=round(max_rss_mb(), 1),
+    )
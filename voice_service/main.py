@@ -1,29 +1,292 @@
 import asyncio
+import time
+from datetime import datetime, timezone
+from concurrent.futures.process import BrokenProcessPool
 
-from aio_pika.abc import AbstractIncomingMessage
+from aio_pika.abc import AbstractIncomingMessage, AbstractQueue
 
+from adapters.blobs import get_blob_storage
 from adapters.rabbit import RMQ
+from adapters.tasks import queue_depth as celery_queue_depth
+from adapters.tasks import send_recognition_task
 from core.config import settings
 from core.logger import logger
-from worker import request_async_api
+from core.process import process_stats
+from services.grammar import refresh_vocabulary
+from services.jobs import JobInProgressError, job_states
+from services.routing import ModelFallbackPolicy
 
+# Короткие команды и длинные записи читаются из разных очередей,
+# чтобы одна длинная загрузка не задерживала десятки коротких.
+# Очередь voice_service остаётся короткой полосой и по-прежнему
+# принимает сообщения со старым ключом events.files
+SHORT_LANE = ("voice_service", ("events.files", "events.files.short"))
+LONG_LANE = ("voice_service.long", ("events.files.long",))
+
+fallback_policy: ModelFallbackPolicy | None = None
+
+
+def get_headers(message: AbstractIncomingMessage) -> dict:
+    headers = {
+        key: value.decode() if isinstance(value, bytes) else value
+        for key, value in message.headers.items()
+    }
+    headers.setdefault("process_id", message.correlation_id)
+    headers.setdefault(
+        "lane",
+        "long" if message.routing_key == "events.files.long" else "short",
+    )
+    return headers
+
+
+def route_message(message: AbstractIncomingMessage) -> dict:
+    """Функция читает заголовки и выбирает модель с учётом нагрузки."""
+
+    headers = get_headers(message)
+    if fallback_policy:
+        if message.timestamp:
+            published = message.timestamp
+            if published.tzinfo is None:
+                published = published.replace(tzinfo=timezone.utc)
+            fallback_policy.observe_wait(
+                (datetime.now(timezone.utc) - published).total_seconds()
+            )
+        fallback_policy.route(headers)
+    return headers
+
+
+async def sweep_blobs():
+    """Фоновая очистка аудио, оставшегося от упавших задач."""
+
+    storage = get_blob_storage()
+    while True:
+        await asyncio.sleep(settings.blob_sweep_interval)
+        removed = await asyncio.to_thread(storage.sweep, settings.blob_ttl)
+        if removed:
+            logger.info("Удалены устаревшие аудиофайлы", count=removed)
 
-async def main():
-    rabbit = RMQ()
 
-    await rabbit.connect(settings.get_amqp_uri(), queue_name="voice_service")
-    await rabbit.queue.bind(rabbit.exchange, routing_key="events.files")
+async def refresh_grammar():
+    """Фоновое обновление словаря грамматики из каталога."""
 
-    async with rabbit.queue.iterator() as iterator:
+    while True:
+        await asyncio.to_thread(refresh_vocabulary)
+        await asyncio.sleep(settings.grammar_refresh_interval)
+
+
+async def watch_load(rabbit: RMQ, policy: ModelFallbackPolicy):
+    """Фоновая проверка нагрузки для перехода на малую модель.
+    В режиме Celery к очередям RabbitMQ добавляются очереди Celery."""
+
+    while True:
+        await asyncio.sleep(settings.fallback_interval)
+        try:
+            depth = await rabbit.queue_depth()
+            if settings.execution_mode == "celery":
+                depth += await asyncio.to_thread(celery_queue_depth)
+        except Exception as error:
+            logger.error(f"Не удалось получить глубину очереди - {error}")
+            continue
+        policy.update(depth)
+
+
+async def forward_to_celery(queue: AbstractQueue):
+    async with queue.iterator() as iterator:
         message: AbstractIncomingMessage
         async for message in iterator:
             async with message.process(ignore_processed=True):
                 logger.info("Получено новое сообщение в очереди")
-                # request_async_api(message)
-                request_async_api.delay(message.body)
+                send_recognition_task(message.body, route_message(message))
                 await message.ack()
 
 
+async def consume_with_celery(rabbit: RMQ):
+    await asyncio.gather(*(forward_to_celery(queue) for queue in rabbit.queues))
+
+
+async def handle_with_pool(
+    rabbit: RMQ,
+    pool,
+    message: AbstractIncomingMessage,
+    autoscaler=None,
+):
+    """Сообщение подтверждается только после распознавания
+    и публикации события с поисковым запросом."""
+
+    logger.info("Получено новое сообщение в очереди")
+    headers = route_message(message)
+    # Отменённая задача не занимает процесс пула
+    if await asyncio.to_thread(job_states.is_cancelled, headers["process_id"]):
+        logger.info("Задача отменена клиентом", process_id=headers["process_id"])
+        if headers.get("blob_key"):
+            await asyncio.to_thread(get_blob_storage().delete, headers["blob_key"])
+        await message.ack()
+        return
+
+    started = time.perf_counter()
+    try:
+        event = await pool.process(message.body, headers)
+        if autoscaler:
+            autoscaler.observe_job(time.perf_counter() - started)
+    except JobInProgressError:
+        if message.redelivered:
+            # Захват мог остаться от упавшего воркера и истечёт сам
+            await asyncio.sleep(settings.job_retry_delay)
+            await message.nack(requeue=True)
+        else:
+            logger.info(
+                "Дубликат задачи, которая уже обрабатывается",
+                process_id=headers["process_id"],
+            )
+            await message.ack()
+    except BrokenProcessPool:
+        await asyncio.to_thread(job_states.release, headers["process_id"])
+        if message.redelivered:
+            # Файл уже ронял процесс: повтор снова уронит пул
+            # вместе со всеми задачами в работе
+            logger.error(
+                "Процесс распознавания упал повторно, сообщение отклонено",
+                process_id=headers["process_id"],
+            )
+            await message.reject()
+        else:
+            logger.error("Процесс распознавания упал, сообщение возвращено")
+            await message.nack(requeue=True)
+    except Exception as error:
+        logger.error(f"Ошибка обработки сообщения - {error}")
+        await message.reject()
+    else:
+        if event:
+            try:
+                await rabbit.send(
+                    routing_key="events.query",
+                    data=event,
+                    correlation_id=event["process_id"],
+                )
+            except Exception as error:
+                # Событие сохранено в состоянии задачи, повтор
+                # сообщения опубликует его без повторного распознавания
+                logger.error(f"Не удалось опубликовать событие - {error}")
+                await asyncio.to_thread(job_states.release, headers["process_id"])
+                await message.nack(requeue=True)
+                return
+            await asyncio.to_thread(job_states.mark_searched, event["process_id"])
+        await message.ack()
+
+
+def pool_size() -> int:
+    if settings.execution_mode == "threads":
+        return settings.recognizer_threads
+    return settings.recognizer_processes
+
+
+def create_pool(size: int):
+    """В режиме threads задания выполняются потоками одного процесса
+    с общей моделью, в режиме pool - процессами после fork."""
+
+    from services.pool import RecognizerPool, RecognizerThreadPool
+
+    if settings.execution_mode == "threads":
+        return RecognizerThreadPool(size)
+    return RecognizerPool(size)
+
+
+async def consume_with_pool(rabbit: RMQ):
+    from services.autoscaler import QueueDepthAutoscaler
+
+    autoscaler = None
+    if settings.autoscale_enabled:
+        pool = create_pool(settings.autoscale_min)
+        autoscaler = QueueDepthAutoscaler(
+            pool=pool,
+            rabbit=rabbit,
+            min_size=settings.autoscale_min,
+            max_size=settings.autoscale_max,
+            interval=settings.autoscale_interval,
+            target_drain_seconds=settings.autoscale_target_drain_seconds,
+            up_ticks=settings.autoscale_up_ticks,
+            down_ticks=settings.autoscale_down_ticks,
+        )
+        await rabbit.set_prefetch(pool.processes)
+        scaling = asyncio.create_task(autoscaler.run())
+    else:
+        pool = create_pool(pool_size())
+
+    tasks = set()
+
+    async def consume_lane(queue: AbstractQueue):
+        async with queue.iterator() as iterator:
+            message: AbstractIncomingMessage
+            async for message in iterator:
+                task = asyncio.create_task(
+                    handle_with_pool(rabbit, pool, message, autoscaler)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+    try:
+        await asyncio.gather(*(consume_lane(queue) for queue in rabbit.queues))
+    finally:
+        if autoscaler:
+            scaling.cancel()
+        pool.shutdown()
+
+
+async def main():
+    global fallback_policy
+
+    rabbit = RMQ()
+    use_pool = settings.execution_mode in ("pool", "threads")
+
+    prefetch_count = long_prefetch_count = None
+    if use_pool:
+        # При автоскейлинге потолок на консьюмера равен максимуму пула,
+        # текущий размер задаётся общим лимитом канала
+        prefetch_count = (
+            settings.autoscale_max
+            if settings.autoscale_enabled
+            else pool_size()
+        )
+        # Длинные записи одновременно занимают не больше
+        # long_lane_slots процессов и не вытесняют короткие команды
+        long_prefetch_count = settings.long_lane_slots
+
+    queue_name, binding_keys = SHORT_LANE
+    await rabbit.connect(
+        settings.get_amqp_uri(),
+        queue_name=queue_name,
+        prefetch_count=prefetch_count,
+    )
+    for routing_key in binding_keys:
+        await rabbit.queue.bind(rabbit.exchange, routing_key=routing_key)
+
+    queue_name, binding_keys = LONG_LANE
+    long_queue = await rabbit.declare_queue(queue_name, long_prefetch_count)
+    for routing_key in binding_keys:
+        await long_queue.bind(rabbit.exchange, routing_key=routing_key)
+    logger.info("Консьюмер готов к приёму сообщений", **process_stats())
+
+    background = []
+    if settings.blob_storage:
+        background.append(asyncio.create_task(sweep_blobs()))
+    if settings.recognition_grammar:
+        background.append(asyncio.create_task(refresh_grammar()))
+    if settings.fallback_models:
+        fallback_policy = ModelFallbackPolicy(
+            fallback_models=settings.fallback_models,
+            depth_high=settings.fallback_depth_high,
+            depth_low=settings.fallback_depth_low,
+            wait_high=settings.fallback_wait_high,
+            wait_low=settings.fallback_wait_low,
+        )
+        background.append(asyncio.create_task(watch_load(rabbit, fallback_policy)))
+
+    if use_pool:
+        await consume_with_pool(rabbit)
+    else:
+        await consume_with_celery(rabbit)
+
+
 if __name__ == "__main__":
     logger.info("Сервис запустился")
     asyncio.run(main())
@@ -0,0 +1,208 @@
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_ALAW = 0x0006
+WAVE_FORMAT_MULAW = 0x0007
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+RESAMPLE_TAPS = 63
+
+
+class AudioFormatError(ValueError):
+    """Файл не является WAV или его кодирование не поддерживается."""
+
+
+@dataclass
+class WavInfo:
+    audio_format: int
+    channels: int
+    sample_rate: int
+    bits_per_sample: int
+    data_offset: int
+    data_size: int
+
+    @property
+    def frame_size(self) -> int:
+        return self.channels * self.bits_per_sample // 8
+
+    @property
+    def frames(self) -> int:
+        return self.data_size // self.frame_size
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+
+def _mulaw_table() -> np.ndarray:
+    codes = ~np.arange(256, dtype=np.uint8)
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = ((mantissa.astype(np.int32) << 3) + 0x84) << exponent
+    values = np.where(codes & 0x80, 0x84 - magnitude, magnitude - 0x84)
+    return (values / 32768).astype(np.float32)
+
+
+def _alaw_table() -> np.ndarray:
+    codes = np.arange(256, dtype=np.uint8) ^ 0x55
+    exponent = (codes >> 4) & 0x07
+    mantissa = (codes & 0x0F).astype(np.int32)
+    magnitude = np.where(
+        exponent == 0,
+        (mantissa << 4) + 8,
+        ((mantissa << 4) + 0x108) << np.maximum(exponent - 1, 0),
+    )
+    values = np.where(codes & 0x80, magnitude, -magnitude)
+    return (values / 32768).astype(np.float32)
+
+
+MULAW_TABLE = _mulaw_table()
+ALAW_TABLE = _alaw_table()
+
+
+def parse_wav_header(buffer) -> WavInfo:
+    """Функция разбирает RIFF-заголовок прямо в буфере, без модуля wave."""
+
+    if len(buffer) < 12 or struct.unpack_from("<4sI4s", buffer)[::2] != (
+        b"RIFF", b"WAVE"
+    ):
+        raise AudioFormatError("Файл не является WAV")
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(buffer):
+        chunk_id, chunk_size = struct.unpack_from("<4sI", buffer, offset)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            if chunk_size < 16 or body + 16 > len(buffer):
+                raise AudioFormatError("Блок fmt обрезан")
+            fmt = struct.unpack_from("<HHIIHH", buffer, body)
+            if (
+                fmt[0] == WAVE_FORMAT_EXTENSIBLE
+                and chunk_size >= 26
+                and body + 26 <= len(buffer)
+            ):
+                subformat = struct.unpack_from("<H", buffer, body + 24)[0]
+                fmt = (subformat, *fmt[1:])
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise AudioFormatError("Блок data идёт раньше блока fmt")
+            audio_format, channels, sample_rate, _, _, bits = fmt
+            if not channels or not sample_rate or bits < 8:
+                raise AudioFormatError(
+                    f"Некорректный блок fmt: {channels} каналов, "
+                    f"{sample_rate} Гц, {bits} бит"
+                )
+            # Потоковые кодировщики пишут нулевой или максимальный размер
+            data_size = min(chunk_size, len(buffer) - body) or len(buffer) - body
+            return WavInfo(
+                audio_format=audio_format,
+                channels=channels,
+                sample_rate=sample_rate,
+                bits_per_sample=bits,
+                data_offset=body,
+                data_size=data_size,
+            )
+        offset = body + chunk_size + (chunk_size & 1)
+
+    raise AudioFormatError("В файле нет блока data")
+
+
+def _decode(buffer, info: WavInfo) -> np.ndarray:
+    """Функция переводит отсчёты в float32 в диапазоне [-1, 1]."""
+
+    count = info.frames * info.channels
+    fmt, bits = info.audio_format, info.bits_per_sample
+
+    def raw(dtype):
+        return np.frombuffer(
+            buffer, dtype=dtype, count=count, offset=info.data_offset
+        )
+
+    if fmt == WAVE_FORMAT_PCM and bits == 8:
+        return (raw(np.uint8).astype(np.float32) - 128) / 128
+    if fmt == WAVE_FORMAT_PCM and bits == 16:
+        return raw("<i2").astype(np.float32) / 32768
+    if fmt == WAVE_FORMAT_PCM and bits == 24:
+        data = np.frombuffer(
+            buffer, dtype=np.uint8, count=count * 3, offset=info.data_offset
+        ).reshape(-1, 3).astype(np.int32)
+        values = data[:, 0] | (data[:, 1] << 8) | (data[:, 2] << 16)
+        return ((values << 8) >> 8).astype(np.float32) / 8388608
+    if fmt == WAVE_FORMAT_PCM and bits == 32:
+        return raw("<i4").astype(np.float32) / 2147483648
+    if fmt == WAVE_FORMAT_IEEE_FLOAT and bits in (32, 64):
+        return raw("<f4" if bits == 32 else "<f8").astype(np.float32)
+    if fmt == WAVE_FORMAT_MULAW and bits == 8:
+        return MULAW_TABLE[raw(np.uint8)]
+    if fmt == WAVE_FORMAT_ALAW and bits == 8:
+        return ALAW_TABLE[raw(np.uint8)]
+
+    raise AudioFormatError(f"Неподдерживаемый формат WAV: {fmt}/{bits} бит")
+
+
+def _lowpass_kernel(cutoff: float, taps: int) -> np.ndarray:
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    return (kernel / kernel.sum()).astype(np.float32)
+
+
+def resample(
+    samples: np.ndarray,
+    source_rate: int,
+    target_rate: int,
+) -> np.ndarray:
+    """Функция меняет частоту дискретизации.
+
+    При понижении частоты сигнал сначала проходит через FIR-фильтр
+    против наложения спектров, затем прореживается (для кратных
+    частот) или интерполируется.
+    """
+
+    if source_rate == target_rate:
+        return samples
+
+    if source_rate > target_rate:
+        kernel = _lowpass_kernel(target_rate / source_rate / 2, RESAMPLE_TAPS)
+        samples = np.convolve(samples, kernel, mode="same")
+        if source_rate % target_rate == 0:
+            return samples[::source_rate // target_rate]
+
+    size = int(len(samples) * target_rate / source_rate)
+    positions = np.arange(size) * (source_rate / target_rate)
+    return np.interp(
+        positions, np.arange(len(samples)), samples
+    ).astype(np.float32)
+
+
+def normalize_audio(buffer, target_rate: int) -> np.ndarray:
+    """Функция приводит WAV к моно int16 с частотой модели.
+
+    Результат всегда копируется из буфера: представление поверх
+    разделяемой памяти или mmap, оставшееся в трассировке исключения,
+    не даёт закрыть буфер (BufferError) и скрывает исходную ошибку.
+    """
+
+    info = parse_wav_header(buffer)
+    if (
+        info.audio_format == WAVE_FORMAT_PCM
+        and info.bits_per_sample == 16
+        and info.channels == 1
+        and info.sample_rate == target_rate
+    ):
+        return np.frombuffer(
+            buffer, dtype="<i2", count=info.frames, offset=info.data_offset
+        ).copy()
+
+    samples = _decode(buffer, info)
+    if info.channels > 1:
+        samples = samples.reshape(-1, info.channels).mean(
+            axis=1, dtype=np.float32
+        )
+    samples = resample(samples, info.sample_rate, target_rate)
+
+    return np.clip(samples * 32768, -32768, 32767).astype(np.int16)
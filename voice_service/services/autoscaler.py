@@ -0,0 +1,113 @@
+import asyncio
+import math
+import socket
+import time
+
+from redis import RedisError
+
+from adapters.rabbit import RMQ
+from adapters.redis import get_redis
+from core.logger import logger
+from services.pool import RecognizerPool, RecognizerThreadPool
+
+
+class QueueDepthAutoscaler:
+    """Класс подбирает число процессов распознавания по очереди.
+
+    Нужная параллельность считается так, чтобы текущую очередь и
+    задачи в работе можно было разобрать за target_drain_seconds при
+    среднем времени задачи. Рост происходит после up_ticks подряд
+    идущих замеров с нехваткой, сокращение — после down_ticks замеров
+    с избытком (гистерезис против дребезга). Решения пишутся в лог
+    и в хэш Redis autoscaler:<hostname>.
+    """
+
+    def __init__(
+        self,
+        pool: RecognizerPool | RecognizerThreadPool,
+        rabbit: RMQ,
+        min_size: int,
+        max_size: int,
+        interval: float,
+        target_drain_seconds: float,
+        up_ticks: int,
+        down_ticks: int,
+    ) -> None:
+        self.pool = pool
+        self.rabbit = rabbit
+        self.min_size = min_size
+        self.max_size = max_size
+        self.interval = interval
+        self.target_drain_seconds = target_drain_seconds
+        self.up_ticks = up_ticks
+        self.down_ticks = down_ticks
+        self.job_seconds = 1.0
+        self.metrics_key = f"autoscaler:{socket.gethostname()}"
+        self._up = 0
+        self._down = 0
+
+    def observe_job(self, seconds: float, weight: float = 0.2) -> None:
+        self.job_seconds += weight * (seconds - self.job_seconds)
+
+    def desired_size(self, depth: int, in_flight: int) -> int:
+        work_seconds = (depth + in_flight) * self.job_seconds
+        size = math.ceil(work_seconds / self.target_drain_seconds)
+        return max(self.min_size, min(self.max_size, size))
+
+    def decide(self, depth: int, in_flight: int) -> int:
+        current = self.pool.processes
+        desired = self.desired_size(depth, in_flight)
+
+        self._up = self._up + 1 if desired > current else 0
+        self._down = self._down + 1 if desired < current else 0
+
+        if self._up >= self.up_ticks:
+            self._up = 0
+            return desired
+        if self._down >= self.down_ticks:
+            self._down = 0
+            # Сокращаемся по одному процессу, чтобы не потерять
+            # пропускную способность на коротком затишье
+            return current - 1
+        return current
+
+    async def tick(self) -> None:
+        depth = await self.rabbit.queue_depth()
+        in_flight = self.pool.in_flight
+        current = self.pool.processes
+        size = self.decide(depth, in_flight)
+
+        if size != current:
+            self.pool.resize(size)
+            await self.rabbit.set_prefetch(size)
+            logger.info(
+                "Изменено число процессов распознавания",
+                previous=current,
+                current=size,
+                queue_depth=depth,
+                in_flight=in_flight,
+                job_seconds=round(self.job_seconds, 3),
+            )
+
+        await asyncio.to_thread(self._export, depth, in_flight, current, size)
+
+    def _export(self, depth: int, in_flight: int, previous: int, size: int) -> None:
+        try:
+            get_redis().hset(self.metrics_key, mapping=dict(
+                concurrency=size,
+                previous_concurrency=previous,
+                queue_depth=depth,
+                in_flight=in_flight,
+                job_seconds=round(self.job_seconds, 3),
+                updated_at=int(time.time()),
+            ))
+        except RedisError as error:
+            logger.error(f"Не удалось записать метрики автоскейлера - {error}")
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tick()
+            except Exception as error:
+                logger.error(f"Ошибка автоскейлера - {error}")
@@ -0,0 +1,94 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from redis import RedisError
+
+from adapters.redis import get_redis
+from core.config import settings
+from core.logger import logger
+
+STATS_KEY = "transcript_cache:stats"
+
+
+class TranscriptCache:
+    """Кэш транскриптов по хэшу нормализованного PCM.
+
+    Одинаковые записи (типовые команды, повторы клиента) распознаются
+    один раз. Кэш двухуровневый: LRU в памяти процесса и Redis с TTL.
+    Статистика попаданий хранится в Redis, чтобы видеть её по всем
+    воркерам сразу.
+    """
+
+    def __init__(self, ttl: int, lru_size: int) -> None:
+        self.ttl = ttl
+        self.lru_size = lru_size
+        self._lru: OrderedDict[str, str] = OrderedDict()
+        # В режиме потоков кэш процесса общий для всех распознавателей
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(pcm: np.ndarray, fingerprint: str) -> str:
+        digest = hashlib.blake2b(pcm, digest_size=16)
+        digest.update(fingerprint.encode())
+        return f"transcript:{digest.hexdigest()}"
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                return self._lru[key]
+
+        try:
+            text = get_redis().get(key)
+        except RedisError as error:
+            logger.error(f"Кэш транскриптов недоступен - {error}")
+            return None
+
+        if text is None:
+            return None
+        text = text.decode()
+        self._remember(key, text)
+        return text
+
+    def set(self, key: str, text: str) -> None:
+        self._remember(key, text)
+        try:
+            get_redis().set(key, text, ex=self.ttl)
+        except RedisError as error:
+            logger.error(f"Кэш транскриптов недоступен - {error}")
+
+    def _remember(self, key: str, text: str) -> None:
+        if not self.lru_size:
+            return
+        with self._lock:
+            self._lru[key] = text
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def record(self, hit: bool, audio_seconds: float) -> None:
+        """Метод учитывает попадание или промах и сколько секунд
+        аудио не пришлось декодировать."""
+
+        try:
+            pipeline = get_redis().pipeline(transaction=False)
+            pipeline.hincrby(STATS_KEY, "hits" if hit else "misses", 1)
+            if hit:
+                pipeline.hincrbyfloat(STATS_KEY, "saved_audio_seconds", audio_seconds)
+            pipeline.execute()
+        except RedisError as error:
+            logger.error(f"Кэш транскриптов недоступен - {error}")
+
+    def stats(self) -> dict:
+        return {
+            key.decode(): float(value)
+            for key, value in get_redis().hgetall(STATS_KEY).items()
+        }
+
+
+transcript_cache = TranscriptCache(
+    ttl=settings.transcript_cache_ttl,
+    lru_size=settings.transcript_cache_lru_size,
+)
@@ -0,0 +1,187 @@
+import json
+import os
+import re
+from pathlib import Path
+
+import requests
+
+from core.config import settings
+from core.logger import logger
+from services.intent import FILLER_WORDS, INTENT_KEYWORDS
+
+CATALOG_FIELDS = {
+    "movies": "title",
+    "persons": "full_name",
+    "genres": "name",
+}
+COMMAND_PHRASES = [
+    "help me find",
+    "find",
+    "show",
+    "найди",
+    "покажи",
+    "включи",
+    *FILLER_WORDS,
+    *(phrase for phrases in INTENT_KEYWORDS.values() for phrase in phrases),
+]
+UNKNOWN_WORD = "[unk]"
+PAGE_SIZE = 1000
+
+pattern_punctuation = re.compile(r"[^\w\s]+")
+pattern_spaces = re.compile(r"\s+")
+
+
+def normalize_phrase(phrase: str) -> str:
+    phrase = pattern_punctuation.sub(" ", phrase.lower())
+    return pattern_spaces.sub(" ", phrase).strip()
+
+
+class CatalogVocabulary:
+    """Класс собирает словарь грамматики распознавания из индексов
+    Elasticsearch и хранит его на диске.
+
+    _seq_no назначается отдельно в каждом шарде, поэтому для каждого
+    шарда индекса запоминается свой последний _seq_no и при обновлении
+    запрашиваются только изменённые документы этого шарда. Если число
+    документов в индексе не сходится (были удаления), индекс
+    перечитывается целиком.
+    """
+
+    def __init__(self, elastic_url: str, cache_path: str) -> None:
+        self.elastic_url = elastic_url
+        self.cache_path = Path(cache_path)
+        self._grammar: str | None = None
+        self._grammar_mtime: float | None = None
+
+    def _request(self, method: str, path: str, body: dict | None = None):
+        response = requests.request(
+            method,
+            f"{self.elastic_url}/{path}",
+            json=body,
+            timeout=settings.elastic_timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def _shards(self, index: str) -> int:
+        index_settings = next(iter(
+            self._request("GET", f"{index}/_settings").values()
+        ))
+        return int(index_settings["settings"]["index"]["number_of_shards"])
+
+    def _fetch_changes(self, index: str, field: str, shard: int, seq_no: int):
+        body = {
+            "size": PAGE_SIZE,
+            "_source": [field],
+            "seq_no_primary_term": True,
+            "sort": [{"_seq_no": "asc"}],
+            "query": {"range": {"_seq_no": {"gt": seq_no}}},
+        }
+        while True:
+            hits = self._request(
+                "POST", f"{index}/_search?preference=_shards:{shard}", body
+            )["hits"]["hits"]
+            if not hits:
+                return
+            for hit in hits:
+                yield hit["_id"], hit["_source"].get(field), hit["_seq_no"]
+            body["search_after"] = hits[-1]["sort"]
+
+    def _refresh_index(self, index: str, field: str, state: dict) -> bool:
+        changed = False
+        # Ключи JSON - строки, поэтому номер шарда хранится строкой
+        shards = state["seq_no"]
+        for shard in range(self._shards(index)):
+            last_seq_no = shards.get(str(shard), -1)
+            for doc_id, value, seq_no in self._fetch_changes(
+                index, field, shard, last_seq_no
+            ):
+                state["docs"][doc_id] = value
+                shards[str(shard)] = max(shards.get(str(shard), -1), seq_no)
+                changed = True
+
+        count = self._request("GET", f"{index}/_count")["count"]
+        if count != len(state["docs"]):
+            state.update(seq_no={}, docs={})
+            self._refresh_index(index, field, state)
+            changed = True
+        return changed
+
+    def load(self) -> dict:
+        try:
+            return json.loads(self.cache_path.read_text())
+        except FileNotFoundError:
+            return {}
+
+    def refresh(self) -> bool:
+        """Метод догружает изменения каталога и перезаписывает кэш."""
+
+        cache = self.load()
+        changed = False
+        for index, field in CATALOG_FIELDS.items():
+            state = cache.setdefault(index, {"seq_no": {}, "docs": {}})
+            if not isinstance(state["seq_no"], dict):
+                # Кэш старого формата с одним _seq_no на индекс
+                state.update(seq_no={}, docs={})
+            changed |= self._refresh_index(index, field, state)
+
+        if changed or not self.cache_path.exists():
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(cache, ensure_ascii=False))
+            os.replace(tmp_path, self.cache_path)
+            logger.info(
+                "Словарь грамматики обновлён",
+                **{index: len(state["docs"]) for index, state in cache.items()},
+            )
+        return changed
+
+    def phrases(self) -> list[str]:
+        phrases = {normalize_phrase(phrase) for phrase in COMMAND_PHRASES}
+        for state in self.load().values():
+            phrases.update(
+                normalize_phrase(value)
+                for value in state["docs"].values()
+                if value
+            )
+        phrases.discard("")
+        return sorted(phrases) + [UNKNOWN_WORD]
+
+    def get_grammar(self) -> str | None:
+        """Метод возвращает грамматику для KaldiRecognizer
+        и перечитывает её, только если файл кэша изменился."""
+
+        try:
+            mtime = self.cache_path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+        if mtime != self._grammar_mtime:
+            self._grammar = json.dumps(self.phrases(), ensure_ascii=False)
+            self._grammar_mtime = mtime
+        return self._grammar
+
+
+vocabulary = CatalogVocabulary(
+    elastic_url=settings.get_elastic_url(),
+    cache_path=settings.grammar_cache_path,
+)
+
+
+def refresh_vocabulary() -> None:
+    try:
+        vocabulary.refresh()
+    except requests.RequestException as error:
+        logger.error(f"Не удалось обновить словарь грамматики - {error}")
+
+
+def get_grammar() -> str | None:
+    if not settings.recognition_grammar:
+        return None
+    return vocabulary.get_grammar()
+
+
+def get_grammar_version() -> str:
+    if not get_grammar():
+        return ""
+    return str(vocabulary._grammar_mtime)
@@ -0,0 +1,117 @@
+from collections import deque
+from dataclasses import dataclass
+
+INTENT_KEYWORDS = {
+    "movie": [
+        "movie", "film", "фильм", "фильма", "фильмы", "фильмов",
+        "кино", "кинофильм", "мультфильм", "сериал",
+    ],
+    "person": [
+        "person", "actor", "actress", "director", "writer",
+        "персона", "актёр", "актер", "актёра", "актера", "актриса",
+        "актрису", "режиссёр", "режиссер", "режиссёра", "режиссера",
+        "сценарист", "сценариста", "с актёром", "с актером",
+    ],
+    "genre": [
+        "genre", "жанр", "жанра", "жанре", "в жанре",
+    ],
+}
+FILLER_WORDS = {
+    "the", "a", "and", "with", "about", "of",
+    "и", "с", "про", "в", "о", "об", "по",
+}
+
+
+@dataclass
+class Intent:
+    name: str
+    entity: str
+    start: int
+    end: int
+
+
+class IntentMatcher:
+    """Класс ищет все ключевые слова запроса за один проход по тексту.
+
+    Ключевые слова (в том числе из нескольких слов) собираются в автомат
+    Ахо-Корасик над словами транскрипта, поэтому стоимость разбора
+    зависит от длины текста, а не от числа синонимов. Сущностью
+    считаются слова после ключевого слова до следующего ключевого
+    слова или конца текста.
+    """
+
+    def __init__(self, keywords: dict[str, list[str]]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[tuple[str, int] | None] = [None]
+
+        for intent, phrases in keywords.items():
+            for phrase in phrases:
+                self._add(intent, phrase.lower().split())
+        self._build_links()
+
+    def _add(self, intent: str, words: list[str]) -> None:
+        node = 0
+        for word in words:
+            if word not in self._goto[node]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+                self._goto[node][word] = len(self._goto) - 1
+            node = self._goto[node][word]
+        self._output[node] = (intent, len(words))
+
+    def _build_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for word, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and word not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(word, 0)
+                # Самое длинное совпадение, заканчивающееся в этом узле
+                if self._output[child] is None:
+                    self._output[child] = self._output[self._fail[child]]
+
+    def _matches(self, words: list[str]) -> list[tuple[int, int, str]]:
+        matches = []
+        node = 0
+        for position, word in enumerate(words):
+            while node and word not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(word, 0)
+            output = self._output[node]
+            if output is None:
+                continue
+            intent, length = output
+            start = position + 1 - length
+            # Более длинное ключевое слово поглощает вложенное
+            while matches and matches[-1][0] >= start:
+                matches.pop()
+            if not matches or matches[-1][1] <= start:
+                matches.append((start, position + 1, intent))
+        return matches
+
+    def parse(self, text: str) -> list[Intent]:
+        words = text.lower().split()
+        matches = self._matches(words)
+
+        intents = []
+        for index, (start, end, name) in enumerate(matches):
+            stop = matches[index + 1][0] if index + 1 < len(matches) else len(words)
+            while end < stop and words[end] in FILLER_WORDS:
+                end += 1
+            while stop > end and words[stop - 1] in FILLER_WORDS:
+                stop -= 1
+            if end < stop:
+                intents.append(Intent(name, " ".join(words[end:stop]), end, stop))
+        return intents
+
+
+matcher = IntentMatcher(INTENT_KEYWORDS)
+
+
+def parse_intents(text: str) -> list[Intent]:
+    return matcher.parse(text)
@@ -0,0 +1,176 @@
+import os
+import socket
+import time
+from typing import Callable
+
+import orjson
+
+from redis import RedisError
+
+from adapters.redis import get_redis
+from core.config import settings
+from core.logger import logger
+
+CLAIMED = "claimed"
+RECOGNIZED = "recognized"
+SEARCHED = "searched"
+
+# Захват удаляется, только если он всё ещё принадлежит этому воркеру:
+# после истечения TTL задачу мог захватить другой воркер
+RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class JobInProgressError(Exception):
+    """Задачу с тем же process_id сейчас обрабатывает другой воркер."""
+
+
+class JobCancelledError(Exception):
+    """Клиент отменил задачу во время распознавания."""
+
+
+class JobStateStore:
+    """Состояние обработки задачи по process_id в Redis.
+
+    Запись хранит стадию (claimed -> recognized -> searched, где
+    searched означает, что событие events.query опубликовано)
+    и транскрипт. Повторно доставленное или задублированное
+    сообщение продолжает обработку с последней завершённой стадии.
+    Захват задачи хранится отдельным ключом с TTL и истекает сам,
+    если воркер упал.
+    """
+
+    def __init__(self, enabled: bool, ttl: int, claim_ttl: int) -> None:
+        self.enabled = enabled
+        self.ttl = ttl
+        self.claim_ttl = claim_ttl
+        # Процессы пула захватывают задачи от имени консьюмера,
+        # который подтверждает сообщения и освобождает захват
+        self.owner_id: str | None = None
+
+    @property
+    def owner(self) -> str:
+        # pid берётся при каждом захвате: объект создаётся до fork
+        return self.owner_id or f"{socket.gethostname()}:{os.getpid()}"
+
+    @staticmethod
+    def _key(process_id: str) -> str:
+        return f"job:{process_id}"
+
+    @staticmethod
+    def _claim_key(process_id: str) -> str:
+        return f"job:{process_id}:claim"
+
+    @staticmethod
+    def _cancel_key(process_id: str) -> str:
+        # Ключ ставит web_api в DELETE /api/v1/search/{process_id}
+        return f"job:{process_id}:cancelled"
+
+    def is_cancelled(self, process_id: str) -> bool:
+        try:
+            return bool(get_redis().exists(self._cancel_key(process_id)))
+        except RedisError as error:
+            logger.error(f"Состояние задач недоступно - {error}")
+            return False
+
+    def cancel_checker(self, process_id: str, interval: float) -> Callable[[], bool]:
+        """Метод возвращает проверку отмены для цикла декодирования.
+        Redis опрашивается не чаще раза в interval секунд, а не на
+        каждый кусок аудио."""
+
+        next_check = time.monotonic() + interval
+
+        def cancelled() -> bool:
+            nonlocal next_check
+            now = time.monotonic()
+            if now < next_check:
+                return False
+            next_check = now + interval
+            return self.is_cancelled(process_id)
+
+        return cancelled
+
+    def claim(self, process_id: str, extra_ttl: float = 0) -> dict | None:
+        """Метод захватывает задачу и возвращает её запись.
+
+        None означает, что задача уже полностью обработана.
+        Если задачу держит другой воркер, выбрасывается
+        JobInProgressError. При недоступном Redis задача
+        обрабатывается без учёта состояния.
+        """
+
+        if not self.enabled:
+            return {}
+        try:
+            redis = get_redis()
+            claimed = redis.set(
+                self._claim_key(process_id),
+                self.owner,
+                nx=True,
+                ex=self.claim_ttl + int(extra_ttl),
+            )
+            if not claimed:
+                raise JobInProgressError(process_id)
+
+            record = {
+                key.decode(): value.decode()
+                for key, value in redis.hgetall(self._key(process_id)).items()
+            }
+            if record.get("state") == SEARCHED:
+                redis.delete(self._claim_key(process_id))
+                return None
+            if not record:
+                record = dict(state=CLAIMED)
+                self._save(process_id, record)
+            return record
+        except RedisError as error:
+            logger.error(f"Состояние задач недоступно - {error}")
+            return {}
+
+    def mark_recognized(self, process_id: str, event: dict) -> None:
+        """Вместе с транскриптом сохраняется готовое событие
+        events.query, чтобы повтор не разбирал текст заново."""
+
+        if self.enabled:
+            self._save(process_id, dict(
+                state=RECOGNIZED,
+                transcript=event["text"],
+                model=event["model"],
+                event=orjson.dumps(event),
+            ))
+
+    def mark_searched(self, process_id: str) -> None:
+        if self.enabled:
+            self._save(process_id, dict(state=SEARCHED))
+            self.release(process_id)
+
+    def release(self, process_id: str) -> None:
+        if not self.enabled:
+            return
+        try:
+            get_redis().eval(
+                RELEASE_SCRIPT, 1, self._claim_key(process_id), self.owner
+            )
+        except RedisError as error:
+            logger.error(f"Состояние задач недоступно - {error}")
+
+    def _save(self, process_id: str, fields: dict) -> None:
+        key = self._key(process_id)
+        try:
+            pipeline = get_redis().pipeline()
+            pipeline.hset(key, mapping=fields)
+            pipeline.expire(key, self.ttl)
+            pipeline.execute()
+        except RedisError as error:
+            logger.error(f"Состояние задач недоступно - {error}")
+
+
+job_states = JobStateStore(
+    enabled=settings.job_state_enabled,
+    ttl=settings.job_state_ttl,
+    claim_ttl=settings.job_claim_ttl,
+)
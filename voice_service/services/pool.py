@@ -0,0 +1,131 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+from adapters.model import load_model
+from core.logger import logger
+from services.jobs import job_states
+from services.recognition import process_message
+
+
+def _init_process(owner: str) -> None:
+    job_states.owner_id = owner
+    load_model()
+
+
+def _process_shared(name: str, size: int, headers: dict) -> dict | None:
+    """Функция выполняется в процессе пула и читает аудио
+    из разделяемой памяти без передачи байтов через pickle."""
+
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        with shm.buf[:size] as body:
+            return process_message(body, headers)
+    finally:
+        shm.close()
+
+
+class RecognizerPool:
+    """Класс реализует пул процессов распознавания.
+
+    Модель загружается в родительском процессе до создания пула,
+    поэтому дочерние процессы получают её через fork.
+    """
+
+    def __init__(self, processes: int) -> None:
+        self.processes = processes
+        self.in_flight = 0
+        load_model()
+        self._executor = self._create_executor()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            initializer=_init_process,
+            initargs=(job_states.owner,),
+        )
+
+    async def process(self, body: bytes, headers: dict) -> dict | None:
+        size = len(body)
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        executor = self._executor
+        self.in_flight += 1
+        try:
+            shm.buf[:size] = body
+            return await asyncio.get_running_loop().run_in_executor(
+                executor,
+                _process_shared,
+                shm.name,
+                size,
+                headers,
+            )
+        except BrokenProcessPool:
+            if executor is self._executor:
+                logger.error("Пул распознавания пересоздаётся")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._create_executor()
+            raise
+        finally:
+            self.in_flight -= 1
+            shm.close()
+            shm.unlink()
+
+    def resize(self, processes: int) -> None:
+        """Метод меняет размер пула: новые задачи уходят в новый пул,
+        старый завершает начатые задачи и останавливается."""
+
+        if processes == self.processes:
+            return
+        previous = self._executor
+        self.processes = processes
+        self._executor = self._create_executor()
+        previous.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+class RecognizerThreadPool:
+    """Класс реализует пул потоков распознавания с одной моделью.
+
+    Все потоки разделяют модель процесса, у каждого задания свой
+    KaldiRecognizer из пула распознавателей. Vosk отпускает GIL на
+    время декодирования, поэтому потоки работают на разных ядрах,
+    а память под модель расходуется один раз.
+    """
+
+    def __init__(self, threads: int) -> None:
+        self.processes = threads
+        self.in_flight = 0
+        load_model()
+        self._executor = self._create_executor()
+
+    def _create_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(
+            max_workers=self.processes,
+            thread_name_prefix="recognizer",
+        )
+
+    async def process(self, body: bytes, headers: dict) -> dict | None:
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                process_message,
+                body,
+                headers,
+            )
+        finally:
+            self.in_flight -= 1
+
+    def resize(self, threads: int) -> None:
+        if threads == self.processes:
+            return
+        previous = self._executor
+        self.processes = threads
+        self._executor = self._create_executor()
+        previous.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
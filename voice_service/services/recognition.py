@@ -0,0 +1,457 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+
+from adapters.blobs import check_blob, get_blob_storage
+from adapters.model import registry
+from core.config import settings
+from core.logger import logger
+from services.audio import normalize_audio
+from services.cache import transcript_cache
+from services.grammar import get_grammar, get_grammar_version
+from services.intent import parse_intents
+from services.jobs import RECOGNIZED, JobCancelledError, job_states
+from services.recognizers import recognizers
+from services.routing import resolve_model_name
+from services.speculation import SpeculativeSearch
+from services.vad import split_at_pauses, trim_silence
+
+
+@dataclass
+class Transcript:
+    text: str
+    # Гипотезы каждого сегмента (текст, уверенность), лучшая первой
+    segments: list[list[tuple[str, float]]] = field(default_factory=list)
+
+    def alternatives(self, limit: int) -> list[dict]:
+        """Метод возвращает N-best для всей записи, лучшая гипотеза
+        первой. В лучший транскрипт по очереди подставляются гипотезы
+        одного сегмента, уверенность - сумма уверенностей сегментов."""
+
+        best = [options[0] for options in self.segments if options]
+        score = sum(confidence for _, confidence in best)
+        candidates = [(self.text, score)]
+        for index, options in enumerate(
+            options for options in self.segments if options
+        ):
+            for text, confidence in options[1:]:
+                texts = [best_text for best_text, _ in best]
+                texts[index] = text
+                candidates.append((
+                    " ".join(text for text in texts if text),
+                    score - best[index][1] + confidence,
+                ))
+
+        alternatives = []
+        seen = set()
+        for text, confidence in sorted(candidates, key=lambda item: -item[1]):
+            if text in seen:
+                continue
+            seen.add(text)
+            alternatives.append(dict(text=text, confidence=round(confidence, 3)))
+        return alternatives[:limit]
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_decode_executor() -> ThreadPoolExecutor:
+    """Пул потоков для параллельного декодирования создаётся лениво,
+    уже в процессе воркера, а не до fork."""
+
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.parallel_decode_threads,
+                thread_name_prefix="decode",
+            )
+    return _executor
+
+
+def decode_segment(
+    pcm: np.ndarray,
+    sample_rate: int,
+    chunk_frames: int,
+    words: bool,
+    on_partial: Callable[[str], None] | None = None,
+    deadline: float | None = None,
+    offset: float = 0.0,
+    model_name: str | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> Transcript:
+    """Функция декодирует отрезок аудио распознавателем из пула.
+    offset - начало отрезка в записи в секундах, для журнала.
+    Если cancelled() вернула True, выбрасывается JobCancelledError."""
+
+    transcript = Transcript(text="")
+    texts = []
+
+    def collect(result: dict) -> None:
+        # С SetMaxAlternatives результат - список гипотез с уверенностью
+        if "alternatives" in result:
+            options = [
+                (alternative["text"], alternative.get("confidence", 0.0))
+                for alternative in result["alternatives"]
+            ]
+            result = result["alternatives"][0] if options else dict(text="")
+        else:
+            options = [(result["text"], 0.0)]
+        transcript.segments.append(options)
+
+        texts.append(result["text"])
+
+    # После каждой найденной паузы распознаватель отдаёт готовый
+    # сегмент через Result(), FinalResult() содержит только остаток
+    aborted = False
+    grammar = get_grammar()
+    with recognizers.acquire(
+        model_name or settings.vosk_default_model,
+        sample_rate,
+        words,
+        grammar,
+        get_grammar_version(),
+        settings.recognition_alternatives,
+    ) as rec:
+        for start in range(0, len(pcm), chunk_frames):
+            # Распознаватель сбрасывается и возвращается в пул
+            if cancelled and cancelled():
+                aborted = True
+                break
+            if deadline and time.monotonic() > deadline:
+                # FinalResult() вернёт лучшую гипотезу по уже поданному аудио
+                logger.warning(
+                    "Бюджет декодирования исчерпан, используется частичный транскрипт",
+                    decoded_seconds=round(offset + start / sample_rate, 2),
+                    total_seconds=round(offset + len(pcm) / sample_rate, 2),
+                )
+                break
+            if rec.AcceptWaveform(pcm[start:start + chunk_frames].tobytes()):
+                collect(json.loads(rec.Result()))
+            elif on_partial:
+                partial = json.loads(rec.PartialResult())["partial"]
+                on_partial(" ".join(texts + [partial]))
+        if not aborted:
+            collect(json.loads(rec.FinalResult()))
+
+    if aborted:
+        raise JobCancelledError
+
+    transcript.text = " ".join(text for text in texts if text)
+    return transcript
+
+
+def decode_parallel(
+    pcm: np.ndarray,
+    sample_rate: int,
+    chunk_frames: int,
+    words: bool,
+    deadline: float | None = None,
+    model_name: str | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> Transcript:
+    """Функция режет длинную запись по паузам и декодирует отрезки
+    в пуле потоков. Вызовы vosk отпускают GIL, поэтому отрезки
+    декодируются на разных ядрах; результаты склеиваются по порядку."""
+
+    bounds = split_at_pauses(pcm, sample_rate, settings.parallel_segment_seconds)
+    logger.info("Запись разделена на отрезки", segments=len(bounds))
+
+    futures = [
+        get_decode_executor().submit(
+            decode_segment,
+            pcm[start:end],
+            sample_rate,
+            chunk_frames,
+            words,
+            None,
+            deadline,
+            start / sample_rate,
+            model_name,
+            cancelled,
+        )
+        for start, end in bounds
+    ]
+    try:
+        parts = [future.result() for future in futures]
+    except JobCancelledError:
+        for future in futures:
+            future.cancel()
+        raise
+
+    return Transcript(
+        text=" ".join(part.text for part in parts if part.text),
+        segments=[options for part in parts for options in part.segments],
+    )
+
+
+def recognize_audio(
+    pcm: np.ndarray,
+    sample_rate: int | None = None,
+    chunk_frames: int | None = None,
+    words: bool | None = None,
+    on_partial: Callable[[str], None] | None = None,
+    deadline: float | None = None,
+    model_name: str | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> Transcript:
+    sample_rate = sample_rate or settings.vosk_sample_rate
+    chunk_frames = chunk_frames or settings.recognition_chunk_frames
+    words = settings.recognition_words if words is None else words
+
+    if (
+        settings.parallel_decode
+        and len(pcm) > settings.parallel_min_seconds * sample_rate
+    ):
+        return decode_parallel(
+            pcm, sample_rate, chunk_frames, words, deadline, model_name, cancelled
+        )
+
+    return decode_segment(
+        pcm,
+        sample_rate,
+        chunk_frames,
+        words,
+        on_partial,
+        deadline,
+        model_name=model_name,
+        cancelled=cancelled,
+    )
+
+
+def recognition_fingerprint(sample_rate: int, model_name: str | None = None) -> str:
+    """Функция описывает настройки, от которых зависит транскрипт,
+    чтобы кэш не отдавал текст, полученный с другой моделью."""
+
+    return "|".join((
+        str(registry.path(model_name or settings.vosk_default_model)),
+        str(sample_rate),
+        str(settings.vad_enabled),
+        str(settings.recognition_alternatives),
+        get_grammar_version(),
+    ))
+
+
+def decode_budget(duration: float | None) -> float | None:
+    """Функция считает время на декодирование задачи
+    пропорционально длительности аудио из заголовков."""
+
+    if duration is None:
+        return None
+    return max(settings.decode_budget_min, duration * settings.decode_budget_rtf)
+
+
+def transcribe(
+    body: bytes | memoryview,
+    process_id: str | None = None,
+    sample_rate: int | None = None,
+    chunk_frames: int | None = None,
+    words: bool | None = None,
+    on_partial: Callable[[str], None] | None = None,
+    time_budget: float | None = None,
+    model_name: str | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> tuple[str, list[dict]]:
+    """Функция проводит аудио через весь путь распознавания:
+    нормализация, удаление тишины и декодирование. Возвращает
+    транскрипт и N-best гипотезы (пустой список, если они выключены).
+
+    Если задан time_budget, по его истечении возвращается
+    транскрипт уже декодированной части аудио.
+    """
+
+    deadline = time.monotonic() + time_budget if time_budget else None
+    sample_rate = sample_rate or settings.vosk_sample_rate
+    pcm = normalize_audio(body, sample_rate)
+
+    cache_key = None
+    if settings.transcript_cache_enabled:
+        cache_key = transcript_cache.key(
+            pcm, recognition_fingerprint(sample_rate, model_name)
+        )
+        cached = transcript_cache.get(cache_key)
+        transcript_cache.record(cached is not None, len(pcm) / sample_rate)
+        if cached is not None:
+            logger.info("Транскрипт взят из кэша", process_id=process_id)
+            cached = json.loads(cached)
+            return cached["text"], cached["alternatives"]
+
+    if settings.vad_enabled:
+        pcm, stats = trim_silence(pcm, sample_rate)
+        logger.info(
+            "Тишина удалена",
+            process_id=process_id,
+            original_seconds=round(stats.original_seconds, 2),
+            removed_seconds=round(stats.removed_seconds, 2),
+            removed_ratio=round(stats.removed_ratio, 2),
+        )
+    transcript = recognize_audio(
+        pcm,
+        sample_rate,
+        chunk_frames,
+        words,
+        on_partial,
+        deadline,
+        model_name,
+        cancelled,
+    )
+    alternatives = []
+    if settings.recognition_alternatives > 1:
+        alternatives = transcript.alternatives(settings.recognition_alternatives)
+
+    # Обрезанный по бюджету транскрипт в кэш не попадает
+    if cache_key and not (deadline and time.monotonic() > deadline):
+        transcript_cache.set(cache_key, json.dumps(dict(
+            text=transcript.text,
+            alternatives=alternatives,
+        ), ensure_ascii=False))
+    return transcript.text, alternatives
+
+
+def build_query_event(
+    process_id: str,
+    text: str,
+    model: str | None = None,
+    alternatives: list[dict] | None = None,
+) -> dict:
+    """Функция выделяет из текста тип запроса и имя
+    и формирует событие events.query для search_service.
+    В событии указывается модель, которой получен транскрипт,
+    и запросы из альтернативных гипотез распознавания."""
+
+    intents = parse_intents(text)
+    primary = intents[0] if intents else None
+
+    queries = []
+    for alternative in (alternatives or [])[1:]:
+        alternative_intents = parse_intents(alternative["text"])
+        if alternative_intents:
+            queries.append(dict(
+                text=alternative["text"],
+                confidence=alternative["confidence"],
+                intent=alternative_intents[0].name,
+                query=alternative_intents[0].entity,
+            ))
+
+    return dict(
+        process_id=process_id,
+        intent=primary.name if primary else None,
+        query=primary.entity if primary else None,
+        intents=[
+            dict(intent=intent.name, query=intent.entity)
+            for intent in intents
+        ],
+        text=text,
+        model=model or settings.vosk_default_model,
+        confidence=alternatives[0]["confidence"] if alternatives else None,
+        alternatives=queries,
+    )
+
+
+def process_body(
+    body: bytes | memoryview,
+    process_id: str,
+    time_budget: float | None = None,
+    model_name: str | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> dict:
+    """Функция распознаёт аудио из тела сообщения
+    и возвращает событие с поисковым запросом."""
+
+    if not settings.speculative_search:
+        text, alternatives = transcribe(
+            body,
+            process_id,
+            time_budget=time_budget,
+            model_name=model_name,
+            cancelled=cancelled,
+        )
+        return build_query_event(process_id, text, model_name, alternatives)
+
+    speculation = SpeculativeSearch(process_id, settings.speculative_stable_partials)
+    text, alternatives = transcribe(
+        body,
+        process_id,
+        on_partial=speculation.on_partial,
+        time_budget=time_budget,
+        model_name=model_name,
+        cancelled=cancelled,
+    )
+    return speculation.confirm(
+        build_query_event(process_id, text, model_name, alternatives)
+    )
+
+
+def recognize_message(
+    body: bytes | memoryview,
+    headers: dict,
+    time_budget: float | None = None,
+) -> dict:
+    """Функция распознаёт аудио сообщения очереди.
+
+    Если в заголовках есть blob_key, аудио читается из хранилища
+    (claim-check) и проверяется по размеру и хэшу. Модель выбирается
+    по полю model или по подсказке языка language.
+    """
+
+    process_id = headers["process_id"]
+    model_name = resolve_model_name(headers.get("model"), headers.get("language"))
+    cancelled = job_states.cancel_checker(process_id, settings.cancel_check_interval)
+    blob_key = headers.get("blob_key")
+    if not blob_key:
+        return process_body(body, process_id, time_budget, model_name, cancelled)
+
+    with get_blob_storage().open(blob_key) as blob:
+        check_blob(blob, headers.get("size"), headers.get("blob_hash"))
+        return process_body(blob, process_id, time_budget, model_name, cancelled)
+
+
+def process_message(body: bytes | memoryview, headers: dict) -> dict | None:
+    """Функция обрабатывает сообщение очереди с учётом состояния задачи.
+
+    Повторное сообщение с уже распознанным аудио не декодируется
+    заново. Для полностью обработанной или отменённой клиентом задачи
+    возвращается None. Аудио из хранилища удаляется после обработки.
+    """
+
+    process_id = headers["process_id"]
+    duration = headers.get("duration")
+    time_budget = decode_budget(float(duration) if duration is not None else None)
+
+    if job_states.is_cancelled(process_id):
+        logger.info("Задача отменена клиентом, сообщение пропущено", process_id=process_id)
+        return _drop_blob(headers, None)
+
+    record = job_states.claim(process_id, time_budget or 0)
+    if record is None:
+        logger.info("Задача уже обработана, сообщение пропущено", process_id=process_id)
+        return _drop_blob(headers, None)
+
+    if record.get("state") == RECOGNIZED:
+        logger.info("Транскрипт взят из состояния задачи", process_id=process_id)
+        return _drop_blob(headers, json.loads(record["event"]))
+
+    try:
+        event = recognize_message(body, headers, time_budget)
+    except JobCancelledError:
+        logger.info("Распознавание прервано: задача отменена", process_id=process_id)
+        job_states.release(process_id)
+        return _drop_blob(headers, None)
+    except Exception:
+        job_states.release(process_id)
+        raise
+
+    job_states.mark_recognized(process_id, event)
+    return _drop_blob(headers, event)
+
+
+def _drop_blob(headers: dict, event: dict | None) -> dict | None:
+    if headers.get("blob_key"):
+        get_blob_storage().delete(headers["blob_key"])
+    return event
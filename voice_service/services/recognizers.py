@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator
+
+from vosk import KaldiRecognizer
+
+from adapters.model import get_model, registry
+from core.config import settings
+
+RecognizerKey = tuple[str, int, str, bool, int]
+
+
+class KaldiRecognizerPool:
+    """Пул распознавателей процесса.
+
+    Распознаватели с одинаковыми моделью, частотой, грамматикой, флагом
+    временных меток слов и числом гипотез переиспользуются между задачами после
+    Reset(), а не создаются заново на каждую задачу. Число
+    простаивающих распознавателей ограничено, давно не
+    использованные удаляются.
+    """
+
+    def __init__(self, max_size: int, idle_seconds: float) -> None:
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        # (ключ, порядковый номер) -> (распознаватель, время возврата),
+        # от давно вернувшихся к недавним
+        self._idle: OrderedDict[
+            tuple[RecognizerKey, int], tuple[KaldiRecognizer, float]
+        ] = OrderedDict()
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(
+        self,
+        model_name: str,
+        sample_rate: int,
+        words: bool,
+        grammar: str | None = None,
+        grammar_version: str = "",
+        alternatives: int = 0,
+    ) -> Iterator[KaldiRecognizer]:
+        key = (
+            model_name,
+            sample_rate,
+            grammar_version if grammar else "",
+            words,
+            alternatives,
+        )
+        rec = self._take(key)
+        if rec is None:
+            rec = self._create(model_name, sample_rate, words, grammar, alternatives)
+
+        # После ошибки состояние распознавателя неизвестно,
+        # поэтому в пул он не возвращается
+        yield rec
+        rec.Reset()
+        self._release(key, rec)
+
+    @staticmethod
+    def _create(
+        model_name: str,
+        sample_rate: int,
+        words: bool,
+        grammar: str | None,
+        alternatives: int,
+    ) -> KaldiRecognizer:
+        model = get_model(model_name)
+        if grammar:
+            rec = KaldiRecognizer(model, sample_rate, grammar)
+        else:
+            rec = KaldiRecognizer(model, sample_rate)
+        rec.SetWords(words)
+        if alternatives > 1:
+            rec.SetMaxAlternatives(alternatives)
+        return rec
+
+    def _take(self, key: RecognizerKey) -> KaldiRecognizer | None:
+        with self._lock:
+            self._evict_idle(time.monotonic())
+            for pool_key in reversed(self._idle):
+                if pool_key[0] == key:
+                    rec, _ = self._idle.pop(pool_key)
+                    return rec
+        return None
+
+    def _release(self, key: RecognizerKey, rec: KaldiRecognizer) -> None:
+        if not self.max_size or not registry.is_resident(key[0]):
+            return
+        with self._lock:
+            self._counter += 1
+            self._idle[(key, self._counter)] = (rec, time.monotonic())
+            while len(self._idle) > self.max_size:
+                self._idle.popitem(last=False)
+
+    def _evict_idle(self, now: float) -> None:
+        while self._idle:
+            pool_key = next(iter(self._idle))
+            _, released = self._idle[pool_key]
+            if now - released < self.idle_seconds:
+                break
+            del self._idle[pool_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle.clear()
+
+    def discard_model(self, model_name: str) -> None:
+        """Распознаватели держат ссылку на модель, поэтому при выгрузке
+        модели из реестра они тоже удаляются."""
+
+        with self._lock:
+            for pool_key in list(self._idle):
+                if pool_key[0][0] == model_name:
+                    del self._idle[pool_key]
+
+
+recognizers = KaldiRecognizerPool(
+    max_size=settings.recognizer_pool_size,
+    idle_seconds=settings.recognizer_idle_seconds,
+)
+registry.on_evict.append(recognizers.discard_model)
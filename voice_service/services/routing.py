@@ -0,0 +1,82 @@
+from core.config import settings
+from core.logger import logger
+
+
+def resolve_model_name(model: str | None = None, language: str | None = None) -> str:
+    """Функция выбирает модель по полю сообщения или по подсказке
+    языка ("en-US" -> "en"). Неизвестные имена заменяются моделью
+    по умолчанию. Файловая система и vosk не нужны, поэтому имя
+    вычисляется и в консьюмере при выборе очереди."""
+
+    for name in (model, language and language.lower().split("-")[0]):
+        if name and name in settings.vosk_models:
+            return name
+    return settings.vosk_default_model
+
+
+NORMAL = 0
+SHORT_FALLBACK = 1
+FULL_FALLBACK = 2
+
+
+class ModelFallbackPolicy:
+    """Политика перевода задач на малую модель под нагрузкой.
+
+    Раз в интервал политика смотрит на глубину очереди и на самое
+    долгое ожидание сообщения за интервал. При перегрузке уровень
+    повышается на одну ступень за интервал: сначала на малую модель
+    уходят короткие записи, затем все. Уровень снижается, только когда
+    обе метрики ниже нижних порогов, чтобы маршрут не переключался
+    туда-обратно.
+    """
+
+    def __init__(
+        self,
+        fallback_models: dict[str, str],
+        depth_high: int,
+        depth_low: int,
+        wait_high: float,
+        wait_low: float,
+    ) -> None:
+        self.fallback_models = fallback_models
+        self.depth_high = depth_high
+        self.depth_low = depth_low
+        self.wait_high = wait_high
+        self.wait_low = wait_low
+        self.level = NORMAL
+        self._max_wait = 0.0
+
+    def observe_wait(self, seconds: float) -> None:
+        self._max_wait = max(self._max_wait, seconds)
+
+    def update(self, depth: int) -> int:
+        wait, self._max_wait = self._max_wait, 0.0
+        previous = self.level
+        if depth >= self.depth_high or wait >= self.wait_high:
+            self.level = min(self.level + 1, FULL_FALLBACK)
+        elif depth <= self.depth_low and wait <= self.wait_low:
+            self.level = max(self.level - 1, NORMAL)
+
+        if self.level != previous:
+            logger.warning(
+                "Изменён уровень перехода на малую модель",
+                level=self.level,
+                previous=previous,
+                queue_depth=depth,
+                max_wait_seconds=round(wait, 2),
+            )
+        return self.level
+
+    def route(self, headers: dict) -> dict:
+        """Метод записывает в заголовки модель, которой будет
+        распознана задача."""
+
+        model = resolve_model_name(headers.get("model"), headers.get("language"))
+        fallback = self.fallback_models.get(model)
+        if fallback and (
+            self.level == FULL_FALLBACK
+            or (self.level == SHORT_FALLBACK and headers.get("lane") == "short")
+        ):
+            model = fallback
+        headers["model"] = model
+        return headers
@@ -0,0 +1,55 @@
+from adapters.publisher import publish_query
+from core.logger import logger
+from services.intent import parse_intents
+
+
+class SpeculativeSearch:
+    """Класс запускает поиск по промежуточной гипотезе распознавания.
+
+    Когда первое намерение и сущность в частичных результатах не
+    меняются stable_partials раз подряд, в search_service уходит
+    событие speculative=True. Итоговое событие помечается
+    speculation_confirmed, если окончательный транскрипт дал тот же
+    запрос: тогда search_service берёт готовый результат вместо
+    повторного поиска.
+    """
+
+    def __init__(self, process_id: str, stable_partials: int) -> None:
+        self.process_id = process_id
+        self.stable_partials = stable_partials
+        self.published: tuple[str, str] | None = None
+        self._candidate: tuple[str, str] | None = None
+        self._seen = 0
+
+    def on_partial(self, text: str) -> None:
+        if self.published:
+            return
+
+        intents = parse_intents(text)
+        candidate = (intents[0].name, intents[0].entity) if intents else None
+        if candidate is None or candidate != self._candidate:
+            self._candidate, self._seen = candidate, 1
+            return
+
+        self._seen += 1
+        if self._seen >= self.stable_partials:
+            self.published = candidate
+            publish_query(dict(
+                process_id=self.process_id,
+                intent=candidate[0],
+                query=candidate[1],
+                speculative=True,
+            ))
+            logger.info(
+                "Запущен упреждающий поиск",
+                process_id=self.process_id,
+                intent=candidate[0],
+                query=candidate[1],
+            )
+
+    def confirm(self, event: dict) -> dict:
+        event["speculation_confirmed"] = (
+            self.published is not None
+            and self.published == (event["intent"], event["query"])
+        )
+        return event
@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from core.config import settings
+
+
+@dataclass
+class VadStats:
+    original_seconds: float
+    kept_seconds: float
+
+    @property
+    def removed_seconds(self) -> float:
+        return self.original_seconds - self.kept_seconds
+
+    @property
+    def removed_ratio(self) -> float:
+        if not self.original_seconds:
+            return 0.0
+        return self.removed_seconds / self.original_seconds
+
+
+def detect_speech(frames: np.ndarray) -> np.ndarray:
+    """Функция отмечает кадры с речью по энергии и числу переходов
+    через ноль. Порог энергии считается от уровня шума записи, тихие
+    кадры с высокой частотой переходов (глухие согласные) тоже
+    считаются речью."""
+
+    samples = frames.astype(np.float32)
+    energy = np.sqrt(np.mean(samples * samples, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+    noise_floor = np.percentile(energy, 10)
+    threshold = max(noise_floor * settings.vad_energy_ratio, settings.vad_min_energy)
+
+    return (energy > threshold) | (
+        (energy > threshold / 2) & (zcr > settings.vad_zcr_threshold)
+    )
+
+
+def trim_silence(pcm: np.ndarray, sample_rate: int) -> tuple[np.ndarray, VadStats]:
+    """Функция удаляет тишину в начале и конце записи
+    и сокращает длинные паузы внутри неё до vad_max_pause_ms."""
+
+    frame_size = sample_rate * settings.vad_frame_ms // 1000
+    total = len(pcm)
+    count = total // frame_size
+    stats = VadStats(total / sample_rate, total / sample_rate)
+    if not count:
+        return pcm, stats
+
+    frames = pcm[:count * frame_size].reshape(count, frame_size)
+    speech = detect_speech(frames)
+    if not speech.any():
+        return pcm, stats
+
+    hangover = settings.vad_hangover_ms // settings.vad_frame_ms
+    if hangover:
+        kernel = np.ones(2 * hangover + 1)
+        speech = np.convolve(speech, kernel, mode="same") > 0
+
+    # Номер кадра внутри текущей паузы: кадры после max_pause отбрасываются
+    index = np.arange(count)
+    last_speech = np.maximum.accumulate(np.where(speech, index, -1))
+    max_pause = settings.vad_max_pause_ms // settings.vad_frame_ms
+    keep = speech | ((last_speech >= 0) & (index - last_speech <= max_pause))
+
+    speech_index = np.flatnonzero(speech)
+    keep[speech_index[-1] + 1:] = False
+
+    trimmed = frames[keep].reshape(-1)
+    stats.kept_seconds = len(trimmed) / sample_rate
+    return trimmed, stats
+
+
+def split_at_pauses(
+    pcm: np.ndarray,
+    sample_rate: int,
+    max_seconds: float,
+) -> list[tuple[int, int]]:
+    """Функция делит запись на отрезки не длиннее max_seconds
+    и возвращает их границы в сэмплах. Разрез делается по самой
+    поздней паузе во второй половине отрезка, чтобы не рвать слова;
+    если пауз нет, отрезок режется по максимальной длине."""
+
+    frame_size = sample_rate * settings.vad_frame_ms // 1000
+    total = len(pcm)
+    count = total // frame_size
+    max_frames = max(int(max_seconds * 1000) // settings.vad_frame_ms, 1)
+    if count <= max_frames:
+        return [(0, total)]
+
+    frames = pcm[:count * frame_size].reshape(count, frame_size)
+    pauses = np.flatnonzero(~detect_speech(frames))
+
+    bounds = []
+    start = 0
+    while count - start > max_frames:
+        limit = start + max_frames
+        candidates = pauses[(pauses > start + max_frames // 2) & (pauses <= limit)]
+        cut = int(candidates[-1]) if len(candidates) else limit
+        bounds.append((start * frame_size, cut * frame_size))
+        start = cut
+    bounds.append((start * frame_size, total))
+    return bounds
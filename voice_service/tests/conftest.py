@@ -0,0 +1,10 @@
+import os
+import sys
+from pathlib import Path
+
+# Модули сервиса импортируются от корня voice_service, как в образе
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Обязательные настройки без значений по умолчанию
+for name in ("SENTRY_DSN", "RABBIT_HOST", "RABBIT_PORT", "RABBIT_USER", "RABBIT_PASS"):
+    os.environ.setdefault(name, "")
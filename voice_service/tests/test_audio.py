@@ -0,0 +1,130 @@
+import struct
+
+import numpy as np
+import pytest
+
+from services.audio import (
+    WAVE_FORMAT_EXTENSIBLE,
+    WAVE_FORMAT_IEEE_FLOAT,
+    WAVE_FORMAT_PCM,
+    AudioFormatError,
+    normalize_audio,
+    parse_wav_header,
+)
+
+RATE = 16000
+
+
+def make_wav(
+    data: bytes,
+    channels: int = 1,
+    sample_rate: int = RATE,
+    bits: int = 16,
+    audio_format: int = WAVE_FORMAT_PCM,
+) -> bytes:
+    block_align = channels * bits // 8
+    fmt = struct.pack(
+        "<HHIIHH",
+        audio_format,
+        channels,
+        sample_rate,
+        sample_rate * block_align,
+        block_align,
+        bits,
+    )
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+    body += b"data" + struct.pack("<I", len(data)) + data
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def test_target_format_is_copied():
+    samples = np.array([0, 1000, -1000, 32767], dtype="<i2")
+    buffer = bytearray(make_wav(samples.tobytes()))
+
+    pcm = normalize_audio(buffer, RATE)
+    buffer[-8:] = bytes(8)
+
+    assert pcm.tolist() == samples.tolist()
+    assert pcm.flags.owndata
+
+
+@pytest.mark.parametrize(
+    "data, channels, bits, audio_format, expected",
+    [
+        # Стерео сводится в моно средним каналов
+        (np.array([1000, 3000, -2000, 0], "<i2").tobytes(), 2, 16, WAVE_FORMAT_PCM, [2000, -1000]),
+        (bytes([128, 255, 0]), 1, 8, WAVE_FORMAT_PCM, [0, 32512, -32768]),
+        (np.array([0.5, -0.25], "<f4").tobytes(), 1, 32, WAVE_FORMAT_IEEE_FLOAT, [16384, -8192]),
+        (np.array([1 << 30], "<i4").tobytes(), 1, 32, WAVE_FORMAT_PCM, [16384]),
+        (b"\x00\x00\x40" + b"\x00\x00\xc0", 1, 24, WAVE_FORMAT_PCM, [16384, -16384]),
+    ],
+)
+def test_decode_and_downmix(data, channels, bits, audio_format, expected):
+    wav = make_wav(data, channels=channels, bits=bits, audio_format=audio_format)
+
+    pcm = normalize_audio(wav, RATE)
+
+    assert pcm.dtype == np.int16
+    assert pcm.tolist() == expected
+
+
+@pytest.mark.parametrize("source_rate", [8000, 22050, 44100, 48000])
+def test_resample_length(source_rate):
+    seconds = 0.5
+    samples = np.zeros(int(source_rate * seconds), "<i2")
+    wav = make_wav(samples.tobytes(), sample_rate=source_rate)
+
+    pcm = normalize_audio(wav, RATE)
+
+    assert abs(len(pcm) - RATE * seconds) <= 1
+
+
+def test_resample_keeps_low_frequency_tone():
+    t = np.arange(48000) / 48000
+    tone = (10000 * np.sin(2 * np.pi * 440 * t)).astype("<i2")
+    wav = make_wav(tone.tobytes(), sample_rate=48000)
+
+    pcm = normalize_audio(wav, RATE)
+    expected = 10000 * np.sin(2 * np.pi * 440 * np.arange(len(pcm)) / RATE)
+
+    # Края искажены фильтром, середина должна совпадать
+    middle = slice(100, -100)
+    assert np.max(np.abs(pcm[middle] - expected[middle])) < 500
+
+
+@pytest.mark.parametrize(
+    "buffer",
+    [
+        b"",
+        b"RIFF\x00\x00\x00\x00WAVX",
+        b"RIFF\x00\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00",
+        b"RIFF\x00\x00\x00\x00WAVEdata\x00\x00\x00\x00",
+        make_wav(b"\x00\x00", channels=0),
+        make_wav(b"\x00\x00", sample_rate=0),
+        make_wav(b"\x00\x00", bits=0),
+        make_wav(b"\x00\x00")[:36],
+    ],
+)
+def test_parse_wav_header_errors(buffer):
+    with pytest.raises(AudioFormatError):
+        parse_wav_header(buffer)
+
+
+def test_unsupported_encoding():
+    wav = make_wav(b"\x00\x00", audio_format=0x0002)
+
+    with pytest.raises(AudioFormatError):
+        normalize_audio(wav, RATE)
+
+
+def test_extensible_format_uses_subformat():
+    fmt = struct.pack(
+        "<HHIIHHHHI", WAVE_FORMAT_EXTENSIBLE, 1, RATE, RATE * 2, 2, 16, 22, 16, 0
+    ) + struct.pack("<H", WAVE_FORMAT_PCM) + bytes(14)
+    data = np.array([5, -5], "<i2").tobytes()
+    body = b"WAVEfmt " + struct.pack("<I", len(fmt)) + fmt
+    body += b"data" + struct.pack("<I", len(data)) + data
+    wav = b"RIFF" + struct.pack("<I", len(body)) + body
+
+    assert parse_wav_header(wav).audio_format == WAVE_FORMAT_PCM
+    assert normalize_audio(wav, RATE).tolist() == [5, -5]
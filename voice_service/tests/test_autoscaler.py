@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+import pytest
+
+from services.autoscaler import QueueDepthAutoscaler
+
+
+def make_autoscaler(processes: int) -> QueueDepthAutoscaler:
+    return QueueDepthAutoscaler(
+        pool=SimpleNamespace(processes=processes, in_flight=0),
+        rabbit=None,
+        min_size=1,
+        max_size=8,
+        interval=1,
+        target_drain_seconds=10,
+        up_ticks=2,
+        down_ticks=3,
+    )
+
+
+@pytest.mark.parametrize(
+    "depth, in_flight, size",
+    [
+        (0, 0, 1),
+        (5, 4, 1),
+        (40, 2, 5),
+        (1000, 0, 8),
+    ],
+)
+def test_desired_size(depth, in_flight, size):
+    assert make_autoscaler(1).desired_size(depth, in_flight) == size
+
+
+def test_desired_size_follows_job_time():
+    autoscaler = make_autoscaler(1)
+    autoscaler.observe_job(3.0, weight=1.0)
+
+    assert autoscaler.desired_size(10, 0) == 3
+
+
+@pytest.mark.parametrize(
+    "processes, ticks, sizes",
+    [
+        # Рост сразу до нужного размера после up_ticks замеров
+        (1, [(40, 2)] * 2, [1, 5]),
+        (2, [(1000, 0)] * 2, [2, 8]),
+        # Сокращение по одному процессу после down_ticks замеров
+        (4, [(0, 0)] * 3, [4, 4, 3]),
+        # Смена направления сбрасывает счётчики
+        (4, [(100, 0), (0, 0), (100, 0), (0, 0)], [4, 4, 4, 4]),
+        (4, [(40, 0), (40, 0)], [4, 4]),
+    ],
+)
+def test_decide(processes, ticks, sizes):
+    autoscaler = make_autoscaler(processes)
+
+    assert [autoscaler.decide(*tick) for tick in ticks] == sizes
@@ -0,0 +1,37 @@
+import pytest
+
+from services.intent import parse_intents
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("найди фильм матрица", [("movie", "матрица")]),
+        ("find movie the matrix", [("movie", "matrix")]),
+        ("кино в жанре комедия", [("genre", "комедия")]),
+        ("фильмы с актёром киану ривз", [("person", "киану ривз")]),
+        (
+            "покажи сериал друзья с актером мэттью перри",
+            [("movie", "друзья"), ("person", "мэттью перри")],
+        ),
+        (
+            "actor tom hanks and director steven spielberg",
+            [("person", "tom hanks"), ("person", "steven spielberg")],
+        ),
+        ("Найди ФИЛЬМ Матрица", [("movie", "матрица")]),
+        ("фильм", []),
+        ("просто текст", []),
+        ("", []),
+    ],
+)
+def test_parse_intents(text, expected):
+    intents = parse_intents(text)
+
+    assert [(intent.name, intent.entity) for intent in intents] == expected
+
+
+def test_parse_intents_spans():
+    words = "найди фильм про матрица".split()
+    intent, = parse_intents(" ".join(words))
+
+    assert words[intent.start:intent.end] == ["матрица"]
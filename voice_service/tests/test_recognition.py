@@ -0,0 +1,42 @@
+import pytest
+
+from services.recognition import Transcript
+
+SEGMENTS = [
+    [("найди фильм", 0.9), ("найди филь", 0.5)],
+    [("матрица", 0.8), ("матрицу", 0.7)],
+]
+
+
+def test_alternatives_order():
+    transcript = Transcript(text="найди фильм матрица", segments=SEGMENTS)
+
+    assert transcript.alternatives(5) == [
+        dict(text="найди фильм матрица", confidence=1.7),
+        dict(text="найди фильм матрицу", confidence=1.6),
+        dict(text="найди филь матрица", confidence=1.3),
+    ]
+
+
+@pytest.mark.parametrize("limit, count", [(1, 1), (2, 2), (10, 3)])
+def test_alternatives_limit(limit, count):
+    transcript = Transcript(text="найди фильм матрица", segments=SEGMENTS)
+
+    assert len(transcript.alternatives(limit)) == count
+
+
+@pytest.mark.parametrize(
+    "segments, expected",
+    [
+        ([], [dict(text="привет", confidence=0)]),
+        ([[], [("привет", 0.9)]], [dict(text="привет", confidence=0.9)]),
+        (
+            [[("привет", 0.9), ("привет", 0.4)]],
+            [dict(text="привет", confidence=0.9)],
+        ),
+    ],
+)
+def test_alternatives_edge_cases(segments, expected):
+    transcript = Transcript(text="привет", segments=segments)
+
+    assert transcript.alternatives(5) == expected
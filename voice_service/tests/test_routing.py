@@ -0,0 +1,97 @@
+import pytest
+
+from core.config import settings
+from services.routing import (
+    FULL_FALLBACK,
+    NORMAL,
+    SHORT_FALLBACK,
+    ModelFallbackPolicy,
+    resolve_model_name,
+)
+
+
+@pytest.fixture(autouse=True)
+def models(monkeypatch):
+    monkeypatch.setattr(settings, "vosk_models", ["ru", "ru-small", "en"])
+    monkeypatch.setattr(settings, "vosk_default_model", "ru")
+
+
+@pytest.fixture
+def policy():
+    return ModelFallbackPolicy(
+        fallback_models={"ru": "ru-small"},
+        depth_high=50,
+        depth_low=10,
+        wait_high=10,
+        wait_low=2,
+    )
+
+
+@pytest.mark.parametrize(
+    "model, language, expected",
+    [
+        ("en", None, "en"),
+        (None, "en-US", "en"),
+        (None, "EN", "en"),
+        ("ru-small", "en-US", "ru-small"),
+        ("de", "fr-FR", "ru"),
+        (None, None, "ru"),
+    ],
+)
+def test_resolve_model_name(model, language, expected):
+    assert resolve_model_name(model, language) == expected
+
+
+def test_level_changes_one_step_per_update(policy):
+    # (глубина очереди, самое долгое ожидание, ожидаемый уровень)
+    steps = [
+        (60, 0, SHORT_FALLBACK),
+        (60, 0, FULL_FALLBACK),
+        (60, 0, FULL_FALLBACK),
+        # Между порогами уровень держится
+        (30, 5, FULL_FALLBACK),
+        (5, 1, SHORT_FALLBACK),
+        (5, 1, NORMAL),
+        (5, 1, NORMAL),
+    ]
+    for depth, wait, level in steps:
+        policy.observe_wait(wait)
+        assert policy.update(depth) == level
+
+
+@pytest.mark.parametrize(
+    "wait, depth, level",
+    [
+        (10, 0, SHORT_FALLBACK),
+        (9.9, 49, NORMAL),
+        (2, 10, NORMAL),
+    ],
+)
+def test_thresholds(policy, wait, depth, level):
+    policy.observe_wait(wait)
+
+    assert policy.update(depth) == level
+
+
+def test_wait_resets_every_update(policy):
+    policy.observe_wait(20)
+    policy.update(0)
+
+    assert policy.update(0) == NORMAL
+
+
+@pytest.mark.parametrize(
+    "level, headers, model",
+    [
+        (NORMAL, dict(lane="short"), "ru"),
+        (SHORT_FALLBACK, dict(lane="short"), "ru-small"),
+        (SHORT_FALLBACK, dict(lane="long"), "ru"),
+        (FULL_FALLBACK, dict(lane="long"), "ru-small"),
+        (FULL_FALLBACK, dict(lane="short", language="en-US"), "en"),
+        (FULL_FALLBACK, dict(lane="short", model="ru-small"), "ru-small"),
+    ],
+)
+def test_route(policy, level, headers, model):
+    policy.level = level
+
+    assert policy.route(headers)["model"] == model
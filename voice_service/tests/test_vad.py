@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from core.config import settings
+from services.vad import split_at_pauses, trim_silence
+
+RATE = 16000
+FRAME = 0.03
+HANGOVER = 0.15
+MAX_PAUSE = 0.3
+
+
+@pytest.fixture(autouse=True)
+def vad_settings(monkeypatch):
+    for name, value in dict(
+        vad_frame_ms=30,
+        vad_hangover_ms=150,
+        vad_max_pause_ms=300,
+        vad_energy_ratio=3.0,
+        vad_min_energy=200.0,
+        vad_zcr_threshold=0.25,
+    ).items():
+        monkeypatch.setattr(settings, name, value)
+
+
+def silence(seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.integers(-10, 10, int(RATE * seconds)).astype(np.int16)
+
+
+def speech(seconds: float) -> np.ndarray:
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (5000 * np.sin(2 * np.pi * 200 * t)).astype(np.int16)
+
+
+@pytest.mark.parametrize(
+    "parts, expected_seconds",
+    [
+        # Тишина по краям срезается до hangover вокруг речи
+        ([silence(1), speech(1), silence(1)], 1 + 2 * HANGOVER),
+        # Длинная пауза сокращается: hangover после речи, max_pause
+        # от его конца и hangover перед следующей речью
+        ([speech(1), silence(2), speech(1)], 2 + 2 * HANGOVER + MAX_PAUSE),
+        # Паузы короче max_pause не трогаются
+        ([speech(1), silence(0.2), speech(1)], 2.2),
+        ([speech(2)], 2.0),
+    ],
+)
+def test_trim_silence(parts, expected_seconds):
+    pcm = np.concatenate(parts)
+
+    trimmed, stats = trim_silence(pcm, RATE)
+
+    assert stats.original_seconds == pytest.approx(len(pcm) / RATE)
+    assert stats.kept_seconds == pytest.approx(len(trimmed) / RATE)
+    assert stats.kept_seconds == pytest.approx(expected_seconds, abs=FRAME)
+
+
+@pytest.mark.parametrize(
+    "pcm",
+    [silence(2), silence(0.01), np.zeros(0, np.int16)],
+)
+def test_trim_silence_keeps_audio_without_speech(pcm):
+    trimmed, stats = trim_silence(pcm, RATE)
+
+    assert len(trimmed) == len(pcm)
+    assert stats.removed_seconds == 0
+
+
+def test_split_short_recording():
+    pcm = speech(5)
+
+    assert split_at_pauses(pcm, RATE, 10) == [(0, len(pcm))]
+
+
+def test_split_at_pauses():
+    pcm = np.concatenate([speech(6), silence(3), speech(6), silence(3), speech(2)])
+    pauses = [(6, 9), (15, 18)]
+
+    bounds = split_at_pauses(pcm, RATE, 10)
+
+    assert bounds[0][0] == 0 and bounds[-1][1] == len(pcm)
+    assert all(end == start for (_, end), (start, _) in zip(bounds, bounds[1:]))
+    assert all((end - start) / RATE <= 10 for start, end in bounds)
+    for (_, cut), (pause_start, pause_end) in zip(bounds, pauses):
+        assert pause_start <= cut / RATE <= pause_end
+
+
+def test_split_without_pauses_cuts_at_max_length():
+    pcm = speech(25)
+
+    bounds = split_at_pauses(pcm, RATE, 10)
+
+    assert len(bounds) == 3
+    assert all((end - start) / RATE <= 10 for start, end in bounds)
+    assert bounds[-1][1] == len(pcm)
@@ -1,69 +1,92 @@
-import base64
-import json
 import os
-import re
-import wave
-from io import BytesIO
+from pathlib import Path
 
-import requests
 from celery import Celery
-from vosk import KaldiRecognizer, Model
+from kombu import Queue
+from celery.signals import worker_init, worker_ready, worker_shutdown
 
+from adapters.model import load_model, registry
+from adapters.publisher import publish_query
+from adapters.tasks import RECOGNIZE_TASK, lane_queues
 from core.config import settings
+from core.logger import logger
+from core.process import process_stats
+from services.grammar import refresh_vocabulary
+from services.jobs import JobInProgressError, job_states
+from services.recognition import process_message
 
 celery = Celery(__name__)
 celery.conf.broker_url = os.getenv(
     "CELERY_BROKER_URL", "redis://localhost:6379")
 celery.conf.result_backend = os.getenv(
     "CELERY_RESULT_BACKEND", "redis://localhost:6379")
+celery.conf.accept_content = ["json", "msgpack"]
+# Очереди выводятся из тех же настроек, по которым их выбирает
+# консьюмер (MODEL_QUEUES), поэтому -Q в команде воркера не нужен
+celery.conf.task_queues = [
+    Queue(name)
+    for name in lane_queues(settings.celery_lanes, settings.celery_models)
+]
 
-model = Model('./vosk-model')
-pattern_movie = re.compile(pattern=r"movie\s+([^?!.]+)")
-pattern_person = re.compile(pattern=r"person\s+([^?!.]+)")
-pattern_genre = re.compile(pattern=r"genre\s+([^?!.]+)")
 
-METHODS = {
-    "movie": "api/v1/films/search",
-    "person": "api/v1/persons/persons/search",
-}
+@worker_init.connect
+def preload_model(**kwargs):
+    """Модель загружается в главном процессе до форка,
+    дочерние процессы пула разделяют её страницы (copy-on-write)."""
 
+    Path(settings.worker_ready_file).unlink(missing_ok=True)
+    load_model()
+    if settings.recognition_grammar:
+        refresh_vocabulary()
 
-def recognize_audio(file):
-    wf = wave.open(file, 'rb')
-    rec = KaldiRecognizer(model, wf.getframerate())
-    rec.SetWords(True)
 
-    while True:
-        data = wf.readframes(8000)
-        if len(data) == 0:
-            break
-        rec.AcceptWaveform(data)
+@worker_ready.connect
+def mark_ready(**kwargs):
+    Path(settings.worker_ready_file).touch()
+    logger.info(
+        "Воркер готов к распознаванию",
+        models=registry.stats(),
+        **process_stats(),
+    )
 
-    return json.loads(rec.FinalResult())["text"]
 
+@worker_shutdown.connect
+def mark_not_ready(**kwargs):
+    Path(settings.worker_ready_file).unlink(missing_ok=True)
 
-@celery.task
-def request_async_api(body: bytes):
-    decode_body = json.loads(body.decode())
-    process_id = decode_body.get("process_id")
-    file = decode_body.get("file")
-    file_in_memory = BytesIO(base64.b64decode(file.encode()))
 
-    text = recognize_audio(file_in_memory)
-    if "movie" in text:
-        name = pattern_movie.search(text)
-        type_ = "movie"
-    elif "genre" in text:
-        name = pattern_genre.search(text)
-        type_ = "genre"
-    elif "person" in text:
-        name = pattern_person.search(text)
-        type_ = "person"
-    else:
-        return
+# Задача подтверждается после выполнения: если воркер упал посреди
+# распознавания, брокер доставит её снова и она продолжится
+# с последней сохранённой стадии
+@celery.task(
+    name=RECOGNIZE_TASK,
+    bind=True,
+    acks_late=True,
+    reject_on_worker_lost=True,
+)
+def request_async_api(self, body: bytes, headers: dict):
+    try:
+        event = process_message(body, headers)
+    except JobInProgressError as error:
+        # Захват может принадлежать упавшему воркеру и истечёт сам;
+        # если задачу доделает живой владелец, повтор её пропустит
+        logger.info(
+            "Задача уже обрабатывается другим воркером, повтор позже",
+            process_id=headers["process_id"],
+        )
+        raise self.retry(
+            exc=error,
+            countdown=settings.job_retry_delay,
+            max_retries=None,
+        )
 
-    name = name.group(1).strip()
-    requests.get(
-        f"{settings.search_service_url}/{METHODS[type_]}",
-        params=dict(query=name, process_id=process_id)
-    )
+    if event:
+        try:
+            publish_query(event)
+        except Exception as error:
+            # Событие сохранено в состоянии задачи, повтор
+            # опубликует его без повторного распознавания
+            logger.error(f"Не удалось опубликовать событие - {error}")
+            job_states.release(event["process_id"])
+            raise self.retry(exc=error, countdown=settings.job_retry_delay)
+        job_states.mark_searched(event["process_id"])
@@ -1,4 +1,5 @@
 import asyncio
+from datetime import datetime, timezone
 from typing import Any, Callable
 
 import orjson
@@ -32,14 +33,18 @@ class RMQ:
     async def send(
         self,
         routing_key: str,
-        data: dict,
+        data: dict | bytes,
         correlation_id,
+        headers: dict | None = None,
+        content_type: str = "application/json",
     ) -> None:
 
         message = Message(
-            body=self._serialize(data),
-            content_type="application/json",
+            body=data if isinstance(data, bytes) else self._serialize(data),
+            content_type=content_type,
             correlation_id=correlation_id,
+            headers=headers,
+            timestamp=datetime.now(timezone.utc),
             delivery_mode=DeliveryMode.PERSISTENT
         )
         await self.exchange.publish(message, routing_key, timeout=10)
@@ -1,7 +1,12 @@
 from redis.asyncio import Redis
 
 redis: Redis | None = None
+blob_redis: Redis | None = None
 
 
 async def get_redis() -> Redis:
     return redis
+
+
+async def get_blob_redis() -> Redis:
+    return blob_redis
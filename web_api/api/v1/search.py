@@ -1,7 +1,9 @@
 import uuid
+from http import HTTPStatus
 
-from fastapi import APIRouter, UploadFile, Depends
-from services.base import get_search_service, SearchService
+from fastapi import APIRouter, UploadFile, Depends, HTTPException, Query, Request
+from services.base import get_search_service, read_upload, SearchService
+from services.utils.audio import UploadLimitError
 
 
 router = APIRouter()
@@ -13,24 +15,86 @@ router = APIRouter()
 )
 async def search_data(
     file: UploadFile,
+    language: str | None = None,
     service: SearchService = Depends(get_search_service),
 ) -> uuid.UUID:
 
-    result = await service.create_task(
-        audio_file=file,
-    )
+    try:
+        result = await service.create_task(
+            chunks=read_upload(file),
+            filename=file.filename,
+            content_type=file.content_type,
+            language=language,
+        )
+    except UploadLimitError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            detail=str(error),
+        )
+    return result
+
+
+@router.post(
+    '/search/stream',
+    description='Метод выполняет поиск по голосовому запросу, '
+                'аудио передаётся телом запроса без multipart',
+)
+async def search_stream(
+    request: Request,
+    filename: str | None = None,
+    language: str | None = None,
+    service: SearchService = Depends(get_search_service),
+) -> uuid.UUID:
+
+    # Тело читается по мере поступления и не копится ни в памяти,
+    # ни во временном файле, как при multipart
+    try:
+        result = await service.create_task(
+            chunks=request.stream(),
+            filename=filename,
+            content_type=request.headers.get('content-type'),
+            language=language,
+        )
+    except UploadLimitError as error:
+        raise HTTPException(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            detail=str(error),
+        )
     return result
 
 
+@router.delete(
+    '/search/{process_id}',
+    description='Метод отменяет задачу распознавания',
+    status_code=HTTPStatus.NO_CONTENT,
+)
+async def cancel_search(
+    process_id: str,
+    service: SearchService = Depends(get_search_service),
+) -> None:
+
+    await service.cancel_task(
+        process_id=process_id,
+    )
+
+
 @router.get(
     '/search/result',
-    description='Метод возвращает результаты поиска из БД',
+    description='Метод возвращает результаты поиска из БД. '
+                'С wait > 0 ответ ждёт готовности результата до wait секунд',
 )
 async def get_data(
     process_id: str,
+    wait: float = Query(0, ge=0),
     service: SearchService = Depends(get_search_service),
-):
-    # TODO: Необходимо возвращать модель
+) -> list:
     result = await service.get_status_task(
         process_id=process_id,
+        wait=wait,
     )
+    if result is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail='Результат поиска ещё не готов',
+        )
+    return result
@@ -18,6 +18,21 @@ class Settings(BaseSettings):
     rabbit_user: str = Field(..., env="RABBIT_USER")
     rabbit_pass: str = Field(..., env="RABBIT_PASS")
 
+    blob_storage: str = Field("", env="BLOB_STORAGE")
+    blob_dir: str = Field("./temp/audio", env="BLOB_DIR")
+    blob_redis_url: str = Field("redis://localhost:6379/1", env="BLOB_REDIS_URL")
+    blob_ttl: int = Field(3600, env="BLOB_TTL")
+
+    short_audio_seconds: float = Field(15.0, env="SHORT_AUDIO_SECONDS")
+    cancel_ttl: int = Field(3600, env="CANCEL_TTL")
+
+    results_channel: str = Field("search.results", env="RESULTS_CHANNEL")
+    result_wait_max: float = Field(30.0, env="RESULT_WAIT_MAX")
+
+    upload_chunk_size: int = Field(64 * 1024, env="UPLOAD_CHUNK_SIZE")
+    max_upload_bytes: int = Field(50 * 2 ** 20, env="MAX_UPLOAD_BYTES")
+    max_upload_seconds: float = Field(600.0, env="MAX_UPLOAD_SECONDS")
+
     def get_amqp_uri(self):
         return "amqp://{user}:{password}@{host}:{port}/".format(
             user=self.rabbit_user,
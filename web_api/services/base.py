@@ -1,13 +1,19 @@
-from .handlers import AbstractStorage, AbstractQueue, RedisStorage, RabbitMq
+from .handlers import (AbstractStorage, AbstractQueue, AbstractBlobStorage,
+                       RedisStorage, RabbitMq, FileBlobStorage,
+                       RedisBlobStorage)
+from .utils.audio import AudioStreamMeter
+from .utils.results import ResultWaiter, get_result_waiter
+import hashlib
 import uuid
+from typing import AsyncIterator
 from aio_pika.exceptions import AMQPException
 from core.logger import logger
 from functools import lru_cache
 from redis.asyncio import Redis
-from fastapi import Depends
+from fastapi import Depends, UploadFile
 from adapters.rabbit import get_rabbit, RMQ
-from adapters.redis import get_redis
-import base64
+from adapters.redis import get_redis, get_blob_redis
+from core.config import settings
 
 class SearchService:
 
@@ -15,32 +21,82 @@ class SearchService:
         self,
         storage_handler: AbstractStorage,
         queue_handler: AbstractQueue,
+        blob_handler: AbstractBlobStorage | None = None,
+        result_waiter: ResultWaiter | None = None,
     ):
         self.storage_handler = storage_handler
         self.queue_handler = queue_handler
+        self.blob_handler = blob_handler
+        self.result_waiter = result_waiter
 
     async def create_task(
         self,
-        audio_file,
+        chunks: AsyncIterator[bytes],
+        filename: str | None = None,
+        content_type: str | None = None,
+        language: str | None = None,
     ) -> uuid.UUID:
-        """Метод получает на вход аудио файл и отдает uuid задачи."""
+        """Метод получает на вход аудио файл по кускам и отдает uuid задачи.
+        Язык (ru, en) используется для выбора модели распознавания.
+
+        Размер и длительность проверяются по мере получения кусков,
+        при превышении лимитов выбрасывается UploadLimitError.
+        """
 
         process_id = uuid.uuid4()
+        meter = AudioStreamMeter(
+            max_bytes=settings.max_upload_bytes,
+            max_seconds=settings.max_upload_seconds,
+        )
+        digest = hashlib.blake2b()
 
-        # print(await audio_file.read())
+        async def metered() -> AsyncIterator[bytes]:
+            async for chunk in chunks:
+                meter.feed(chunk)
+                digest.update(chunk)
+                yield chunk
 
-        content = base64.b64encode(await audio_file.read()).decode()
-        try:
-            if audio_file:
-                print('Файл получен')
+        headers = {
+            'process_id': str(process_id),
+            'filename': filename,
+        }
+        if self.blob_handler:
+            # Куски сразу пишутся в хранилище, в сообщение
+            # попадает только ссылка на аудио (claim-check)
+            headers['blob_key'] = await self.blob_handler.put_stream(
+                key=process_id.hex,
+                chunks=metered(),
+                ttl=settings.blob_ttl,
+            )
+            headers['blob_hash'] = digest.hexdigest()
+            content = b''
+        else:
+            # Сообщение RabbitMQ отправляется целиком, поэтому
+            # без хранилища аудио собирается в памяти до max_upload_bytes
+            content = bytearray()
+            async for chunk in metered():
+                content += chunk
+            content = bytes(content)
+        headers['size'] = meter.size
 
+        # Короткие команды идут отдельной полосой и не ждут
+        # за длинными записями; файл без заголовка WAV считается длинным
+        duration = meter.duration
+        lane = 'long'
+        if duration is not None:
+            headers['duration'] = duration
+            if duration <= settings.short_audio_seconds:
+                lane = 'short'
+        headers['lane'] = lane
+        if language:
+            headers['language'] = language
+        try:
             await self.queue_handler.send_data(
-                data={
-                    'process_id': process_id,
-                    'file': content
-                },
-                routing_key='events.files',
-                correlation_id=process_id
+                data=content,
+                headers=headers,
+                content_type=content_type or 'audio/wav',
+                routing_key=f'events.files.{lane}',
+                correlation_id=str(process_id)
             )
 
             return process_id
@@ -48,24 +104,67 @@ class SearchService:
         except AMQPException as error:
             logger.error(f'Ошибка сервиса WebApi - {error}')
 
-    async def get_status_task(
+    async def cancel_task(
         self,
-        process_id: str
-    ):
+        process_id: str,
+    ) -> None:
+        """Метод помечает задачу отменённой: voice_service пропускает
+        её при получении или прерывает начатое распознавание."""
 
-        result = await self.storage_handler.get_by_id(
-            key=process_id
+        await self.storage_handler.set_by_id(
+            key=f'job:{process_id}:cancelled',
+            value=1,
+            ttl=settings.cancel_ttl,
         )
-        # TODO: Поставить условие на проверку статуса if else
-        print(result)
+
+    async def get_status_task(
+        self,
+        process_id: str,
+        wait: float = 0,
+    ) -> list | None:
+        """Метод возвращает результат поиска или None, если его ещё нет.
+        С wait > 0 запрос ждёт результат до wait секунд
+        (не больше result_wait_max)."""
+
+        async def read() -> list | None:
+            return await self.storage_handler.get_by_id(
+                key=process_id
+            )
+
+        if wait > 0 and self.result_waiter:
+            return await self.result_waiter.wait(
+                key=process_id,
+                timeout=min(wait, settings.result_wait_max),
+                read=read,
+            )
+        return await read()
+
+
+async def read_upload(file: UploadFile) -> AsyncIterator[bytes]:
+    """Функция читает загруженный файл кусками upload_chunk_size."""
+
+    while chunk := await file.read(settings.upload_chunk_size):
+        yield chunk
+
+
+def get_blob_handler(blob_redis: Redis) -> AbstractBlobStorage | None:
+    if settings.blob_storage == 'redis':
+        return RedisBlobStorage(blob_redis)
+    if settings.blob_storage == 'fs':
+        return FileBlobStorage(settings.blob_dir)
+    return None
 
 
 @lru_cache()
 def get_search_service(
     storage: Redis = Depends(get_redis),
     queue: RMQ = Depends(get_rabbit),
+    blob_redis: Redis = Depends(get_blob_redis),
+    result_waiter: ResultWaiter = Depends(get_result_waiter),
 ) -> SearchService:
     return SearchService(
         storage_handler=RedisStorage(storage),
         queue_handler=RabbitMq(queue),
+        blob_handler=get_blob_handler(blob_redis),
+        result_waiter=result_waiter,
     )
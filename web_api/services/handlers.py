@@ -1,4 +1,9 @@
 import abc
+import asyncio
+import os
+from pathlib import Path
+from typing import AsyncIterator
+
 from adapters.rabbit import RMQ
 from redis.asyncio import Redis
 import json
@@ -24,6 +29,95 @@ class AbstractQueue(abc.ABC):
         raise NotImplementedError
 
 
+class AbstractBlobStorage(abc.ABC):
+    @abc.abstractmethod
+    async def put(self, *args, **kwargs):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def put_stream(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+class FileBlobStorage(AbstractBlobStorage):
+    def __init__(
+            self,
+            directory: str,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _write(self, key: str, value: bytes) -> None:
+        path = self.directory / key
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_bytes(value)
+        os.replace(tmp_path, path)
+
+    async def put(self, *args, **kwargs) -> str:
+        key = kwargs.get('key')
+        await asyncio.to_thread(self._write, key, kwargs.get('value'))
+        return key
+
+    async def put_stream(self, *args, **kwargs) -> str:
+        """Метод пишет аудио по кускам во временный файл и
+        переименовывает его после последнего куска. При ошибке
+        (в том числе превышении лимита) временный файл удаляется."""
+
+        key = kwargs.get('key')
+        chunks: AsyncIterator[bytes] = kwargs.get('chunks')
+        path = self.directory / key
+        tmp_path = path.with_suffix('.tmp')
+
+        file = await asyncio.to_thread(open, tmp_path, 'wb')
+        try:
+            async for chunk in chunks:
+                await asyncio.to_thread(file.write, chunk)
+            await asyncio.to_thread(file.close)
+            os.replace(tmp_path, path)
+        except Exception:
+            file.close()
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return key
+
+
+class RedisBlobStorage(AbstractBlobStorage):
+    def __init__(
+            self,
+            redis: Redis,
+    ):
+        self.redis = redis
+
+    async def put(self, *args, **kwargs) -> str:
+        key = kwargs.get('key')
+        await self.redis.set(key, kwargs.get('value'), kwargs.get('ttl'))
+        return key
+
+    async def put_stream(self, *args, **kwargs) -> str:
+        """Метод дописывает куски аудио (APPEND) во временный ключ
+        и переименовывает его после последнего куска, поэтому
+        voice_service не увидит недописанный файл. Временный ключ
+        живёт не дольше ttl, даже если загрузка оборвалась."""
+
+        key = kwargs.get('key')
+        ttl = kwargs.get('ttl')
+        chunks: AsyncIterator[bytes] = kwargs.get('chunks')
+        tmp_key = f'{key}:partial'
+
+        try:
+            await self.redis.set(tmp_key, b'', ttl)
+            async for chunk in chunks:
+                pipeline = self.redis.pipeline()
+                pipeline.append(tmp_key, chunk)
+                pipeline.expire(tmp_key, ttl)
+                await pipeline.execute()
+            await self.redis.rename(tmp_key, key)
+        except Exception:
+            await self.redis.delete(tmp_key)
+            raise
+        return key
+
+
 class RedisStorage(AbstractStorage):
     def __init__(
             self,
@@ -57,7 +151,9 @@ class RabbitMq(AbstractQueue):
         await self.rabbit.send(
             routing_key=kwargs.get('routing_key'),
             data=kwargs.get('data'),
-            correlation_id=kwargs.get('correlation_id')
+            correlation_id=kwargs.get('correlation_id'),
+            headers=kwargs.get('headers'),
+            content_type=kwargs.get('content_type', 'application/json'),
         )
 
     async def read_data(self, *args, **kwargs):
@@ -0,0 +1,74 @@
+import struct
+
+# Заголовок WAV ищется только в начале потока
+WAV_HEADER_LIMIT = 64 * 1024
+
+
+class UploadLimitError(Exception):
+    """Загружаемое аудио превышает допустимый размер или длительность."""
+
+
+def parse_wav_format(head: bytes) -> tuple[int, int] | None:
+    """Функция ищет в начале WAV байтрейт и смещение данных (data).
+    Возвращает None, если заголовок ещё не пришёл целиком
+    или файл не похож на WAV."""
+
+    if len(head) < 12 or head[:4] != b'RIFF' or head[8:12] != b'WAVE':
+        return None
+
+    byte_rate = None
+    offset = 12
+    while offset + 8 <= len(head):
+        chunk_id, chunk_size = struct.unpack_from('<4sI', head, offset)
+        offset += 8
+        if chunk_id == b'fmt ' and chunk_size >= 16:
+            if offset + 16 > len(head):
+                return None
+            byte_rate = struct.unpack_from('<I', head, offset + 8)[0]
+        elif chunk_id == b'data':
+            return (byte_rate, offset) if byte_rate else None
+        offset += chunk_size + chunk_size % 2
+
+    return None
+
+
+class AudioStreamMeter:
+    """Класс считает размер и длительность аудио по мере прихода
+    байтов и прерывает загрузку при превышении лимитов.
+
+    Длительность известна, как только пришёл заголовок WAV; для
+    остальных форматов проверяется только размер.
+    """
+
+    def __init__(self, max_bytes: int, max_seconds: float) -> None:
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.size = 0
+        self.byte_rate: int | None = None
+        self.data_offset: int | None = None
+        self._head = bytearray()
+
+    @property
+    def duration(self) -> float | None:
+        if not self.byte_rate:
+            return None
+        return max(self.size - self.data_offset, 0) / self.byte_rate
+
+    def feed(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise UploadLimitError(
+                f'Размер файла больше {self.max_bytes} байт'
+            )
+
+        if self.byte_rate is None and len(self._head) < WAV_HEADER_LIMIT:
+            self._head += chunk[:WAV_HEADER_LIMIT - len(self._head)]
+            wav_format = parse_wav_format(bytes(self._head))
+            if wav_format:
+                self.byte_rate, self.data_offset = wav_format
+                self._head = bytearray()
+
+        if self.duration is not None and self.duration > self.max_seconds:
+            raise UploadLimitError(
+                f'Длительность записи больше {self.max_seconds} секунд'
+            )
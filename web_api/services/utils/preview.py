@@ -1,6 +1,7 @@
 from adapters import rabbit, redis
 from redis.asyncio import Redis
 from core.config import settings
+from services.utils import results
 
 
 async def startup() -> None:
@@ -8,6 +9,14 @@ async def startup() -> None:
         host=settings.redis_host,
         port=settings.redis_port
     )
+    if settings.blob_storage == 'redis':
+        # Тот же адрес, что и у voice_service, который читает аудио
+        redis.blob_redis = Redis.from_url(settings.blob_redis_url)
+    results.result_waiter = results.ResultWaiter(
+        redis=redis.redis,
+        channel=settings.results_channel,
+    )
+    results.result_waiter.start()
     rabbit.rabbit = rabbit.RMQ()
     await rabbit.rabbit.connect(
         url=settings.get_amqp_uri()
@@ -15,8 +24,14 @@ async def startup() -> None:
 
 
 async def shutdown() -> None:
+    if results.result_waiter:
+        await results.result_waiter.stop()
+
     if rabbit.rabbit:
         await rabbit.rabbit.close()
 
     if redis.redis:
         await redis.redis.close()
+
+    if redis.blob_redis:
+        await redis.blob_redis.close()
@@ -0,0 +1,97 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Awaitable, Callable
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.logger import logger
+
+
+class ResultWaiter:
+    """Класс ждёт появления результатов поиска по process_id.
+
+    Один подписчик на канал результатов на воркер web_api: search_service
+    публикует в канал ключ записанного результата, подписчик будит все
+    запросы, ждущие этот ключ. После переподключения к Redis будятся все
+    ожидающие запросы, так как сообщения за время обрыва потеряны.
+    """
+
+    def __init__(self, redis: Redis, channel: str, reconnect_delay: float = 1.0):
+        self.redis = redis
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._waiters: defaultdict[str, set[asyncio.Future]] = defaultdict(set)
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                self._wake_all()
+                async for message in pubsub.listen():
+                    self._wake(message['data'].decode())
+            except RedisError as error:
+                logger.error(f'Подписка на результаты прервана - {error}')
+                await asyncio.sleep(self.reconnect_delay)
+            finally:
+                await pubsub.close()
+
+    def _wake(self, key: str) -> None:
+        for future in self._waiters.pop(key, ()):
+            if not future.done():
+                future.set_result(None)
+
+    def _wake_all(self) -> None:
+        for key in list(self._waiters):
+            self._wake(key)
+
+    async def wait(
+        self,
+        key: str,
+        timeout: float,
+        read: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Метод возвращает результат read(), как только он не None,
+        или None по истечении timeout секунд.
+
+        Ожидание регистрируется до первого чтения, поэтому результат,
+        записанный между чтением и подпиской, не теряется.
+        """
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            future = loop.create_future()
+            self._waiters[key].add(future)
+            try:
+                result = await read()
+                remaining = deadline - loop.time()
+                if result is not None or remaining <= 0:
+                    return result
+                try:
+                    await asyncio.wait_for(future, remaining)
+                except asyncio.TimeoutError:
+                    return await read()
+            finally:
+                waiters = self._waiters.get(key)
+                if waiters is not None:
+                    waiters.discard(future)
+                    if not waiters:
+                        del self._waiters[key]
+
+
+result_waiter: ResultWaiter | None = None
+
+
+async def get_result_waiter() -> ResultWaiter | None:
+    return result_waiter
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Модули сервиса импортируются от корня web_api, как в образе
+sys.path.insert(0, str(Path(__file__).parent.parent))
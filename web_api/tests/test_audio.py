@@ -0,0 +1,85 @@
+import struct
+
+import pytest
+
+from services.utils.audio import AudioStreamMeter, UploadLimitError, parse_wav_format
+
+RATE = 16000
+BYTE_RATE = RATE * 2
+
+
+def make_wav(seconds: float, extra_chunk: bytes = b'') -> bytes:
+    data = bytes(int(BYTE_RATE * seconds))
+    fmt = struct.pack('<HHIIHH', 1, 1, RATE, BYTE_RATE, 2, 16)
+    body = (
+        b'WAVE'
+        + b'fmt ' + struct.pack('<I', len(fmt)) + fmt
+        + extra_chunk
+        + b'data' + struct.pack('<I', len(data)) + data
+    )
+    return b'RIFF' + struct.pack('<I', len(body)) + body
+
+
+def feed(meter: AudioStreamMeter, payload: bytes, chunk_size: int) -> None:
+    for start in range(0, len(payload), chunk_size):
+        meter.feed(payload[start:start + chunk_size])
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 44, 1024, 1 << 20])
+def test_duration_from_chunks(chunk_size):
+    payload = make_wav(3)
+    meter = AudioStreamMeter(max_bytes=1 << 20, max_seconds=10)
+
+    feed(meter, payload, chunk_size)
+
+    assert meter.size == len(payload) == 96044
+    assert meter.duration == pytest.approx(3.0)
+
+
+def test_duration_skips_extra_chunks():
+    list_chunk = b'LIST' + struct.pack('<I', 5) + b'INFO!' + b'\x00'
+    meter = AudioStreamMeter(max_bytes=1 << 20, max_seconds=10)
+
+    feed(meter, make_wav(2, list_chunk), 100)
+
+    assert meter.duration == pytest.approx(2.0)
+
+
+@pytest.mark.parametrize(
+    'max_bytes, max_seconds, message',
+    [
+        (50000, 10, 'Размер'),
+        (1 << 20, 2.5, 'Длительность'),
+    ],
+)
+def test_limits(max_bytes, max_seconds, message):
+    meter = AudioStreamMeter(max_bytes=max_bytes, max_seconds=max_seconds)
+
+    with pytest.raises(UploadLimitError, match=message):
+        feed(meter, make_wav(3), 4096)
+
+
+@pytest.mark.parametrize(
+    'payload',
+    [
+        b'ID3' + bytes(1000),
+        b'OggS' + bytes(1000),
+        b'RIFF' + bytes(4) + b'AVI ' + bytes(1000),
+    ],
+)
+def test_not_wav_has_no_duration(payload):
+    meter = AudioStreamMeter(max_bytes=1 << 20, max_seconds=1)
+
+    feed(meter, payload, 64)
+
+    assert meter.size == len(payload)
+    assert meter.duration is None
+
+
+@pytest.mark.parametrize('length', [0, 4, 12, 20, 36, 43])
+def test_parse_wav_format_partial_header(length):
+    assert parse_wav_format(make_wav(1)[:length]) is None
+
+
+def test_parse_wav_format():
+    assert parse_wav_format(make_wav(1)[:44]) == (BYTE_RATE, 44)